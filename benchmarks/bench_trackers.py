@@ -0,0 +1,97 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+
+# Insert/update/delete throughput of ExpenseTracker and TaskTracker with persistence stubbed
+# out, so only the in-memory bookkeeping is measured. Pass --module to benchmark another
+# version of a tracker, e.g. the one before id indexing:
+#   git show 5b87117:expense_tracker.py > /tmp/old_expense_tracker.py
+#   python benchmarks/bench_trackers.py expenses --module /tmp/old_expense_tracker.py
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # the trackers import tracker_common
+
+TRACKERS = {
+    'expenses': {
+        'file': 'expense_tracker.py',
+        'class': 'ExpenseTracker',
+        'add': lambda t, i: t.add_expense(f"expense {i}", 1),
+        'update': lambda t, i: t.update_expense(i, f"expense {i}", 2, None),
+        'delete': lambda t, i: t.delete_expense(i),
+        'persist': ('_persist', 'save_expenses'),
+    },
+    'tasks': {
+        'file': 'simple_task_tracker.py',
+        'class': 'TaskTracker',
+        'add': lambda t, i: t.add_task(f"task {i}"),
+        'update': lambda t, i: t.update_task(i, f"task {i} updated"),
+        'delete': lambda t, i: t.delete_task(i),
+        'persist': ('_persist', 'save_tasks'),
+    },
+}
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def run(kind, module, size, samples):
+    spec = TRACKERS[kind]
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = getattr(module, spec['class'])(storagefile=os.path.join(tmp, 'bench.json'))
+        # Older versions save through save_*, newer ones through _persist
+        for name in spec['persist']:
+            if hasattr(tracker, name):
+                setattr(tracker, name, lambda *args, **kwargs: None)
+                break
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            for i in range(size):
+                spec['add'](tracker, i)
+            added = size / (time.perf_counter() - start)
+
+            # Updates and deletes are sampled over ids spread across the whole range
+            ids = range(1, size + 1, max(1, size // samples))
+            start = time.perf_counter()
+            for i in ids:
+                spec['update'](tracker, i)
+            updated = len(ids) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in ids:
+                spec['delete'](tracker, i)
+            deleted = len(ids) / (time.perf_counter() - start)
+    return added, updated, deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tracker insert/update/delete throughput")
+    parser.add_argument('trackers', nargs='*', help=f"any of {', '.join(TRACKERS)} (default: all)")
+    parser.add_argument('--sizes', default='10000,100000,1000000', help="comma-separated record counts")
+    parser.add_argument('--samples', type=int, default=1000, help="updates and deletes timed per size")
+    parser.add_argument('--module', help="tracker module file to benchmark instead of the repo's")
+    args = parser.parse_args()
+    unknown = set(args.trackers) - set(TRACKERS)
+    if unknown:
+        parser.error(f"unknown tracker: {', '.join(sorted(unknown))}")
+
+    print(f"{'':20}{'add/s':>12}{'update/s':>12}{'delete/s':>12}")
+    for kind in args.trackers or list(TRACKERS):
+        module = load_module(args.module or os.path.join(ROOT, TRACKERS[kind]['file']))
+        for size in map(int, args.sizes.split(',')):
+            added, updated, deleted = run(kind, module, size, args.samples)
+            print(f"{kind + ' ' + format(size, ','):20}{added:>12,.0f}{updated:>12,.0f}{deleted:>12,.0f}")
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
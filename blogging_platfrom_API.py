@@ -1,6 +1,15 @@
+import base64
+import json
+import re
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from functools import lru_cache, wraps
+from urllib.parse import urlencode
 from flask import Flask, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
+from sqlalchemy import inspect, select, text, tuple_
+from sqlalchemy.orm import load_only, selectinload
 from datetime import datetime
 
 app = Flask(__name__)
@@ -10,14 +19,36 @@ db = SQLAlchemy(app)
 ma = Marshmallow(app)
 
 
+post_tags = db.Table(
+    "post_tags",
+    db.Column("post_id", db.Integer, db.ForeignKey("blog_post.id", ondelete="CASCADE"), primary_key=True),
+    db.Column("tag_id", db.Integer, db.ForeignKey("tag.id", ondelete="CASCADE"), primary_key=True),
+    db.Index("ix_post_tags_tag_post", "tag_id", "post_id"),
+)
+
+
+class Tag(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False, unique=True)
+    # Kept up to date by set_tags and link_new_posts, so /tags never counts rows
+    post_count = db.Column(db.Integer, nullable=False, default=0)
+
+
 class BlogPost(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     content = db.Column(db.Text, nullable=False)
     category = db.Column(db.String(50), nullable=False)
-    tags = db.Column(db.String(200))
+    tags = db.Column(db.String(200))  # comma-joined copy of tag_list, for responses and the search index
     createdAt = db.Column(db.DateTime, default=datetime.utcnow)
     updatedAt = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    tag_list = db.relationship(Tag, secondary=post_tags)
+
+    # Keyset pagination walks these indexes instead of sorting or offsetting the table
+    __table_args__ = (
+        db.Index("ix_blog_post_created_id", "createdAt", "id"),
+        db.Index("ix_blog_post_category_created_id", "category", "createdAt", "id"),
+    )
 
 
 class BlogPostSchema(ma.SQLAlchemyAutoSchema):
@@ -27,44 +58,430 @@ class BlogPostSchema(ma.SQLAlchemyAutoSchema):
 post_schema = BlogPostSchema()
 posts_schema = BlogPostSchema(many=True)
 
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+POST_FIELDS = frozenset(post_schema.fields)
+
+
+@lru_cache(maxsize=64)
+def projected_schema(fields):
+    return BlogPostSchema(many=True, only=fields)
+
+
+def encode_cursor(post):
+    raw = json.dumps([post.createdAt.isoformat(), post.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    created_at, post_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    return datetime.fromisoformat(created_at), int(post_id)
+
+
+def create_indexes():
+    # create_all() only creates missing tables, so indexes added to an existing table are created here
+    for table in (BlogPost.__table__, post_tags):
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+
+def clean_tags(tags):
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        return None
+    return list(dict.fromkeys(tag.strip() for tag in tags if tag.strip()))
+
+
+def set_post_tags(post, names):
+    set_tags([(post, names)])
+
+
+def set_tags(changes):
+    # Links each post to exactly its tags, creating missing ones with a single lookup. Every tag's
+    # count moves by its net change in one SQL increment, so concurrent writers can't lose updates
+    tags = {tag.name: tag for post, _ in changes for tag in post.tag_list}
+    missing = {name for _, names in changes for name in names} - set(tags)
+    if missing:
+        tags.update((tag.name, tag) for tag in Tag.query.filter(Tag.name.in_(missing)))
+    created = set()
+    deltas = defaultdict(int)
+    for post, names in changes:
+        current = {tag.name for tag in post.tag_list}
+        wanted = set(names)
+        for name in current - wanted:
+            deltas[name] -= 1
+        for name in wanted - current:
+            deltas[name] += 1
+            if name not in tags:
+                tags[name] = Tag(name=name)
+                db.session.add(tags[name])
+                created.add(name)
+        post.tag_list = [tags[name] for name in names]
+        post.tags = ",".join(names)
+    for name, delta in deltas.items():
+        if name in created:
+            tags[name].post_count = delta
+        elif delta:
+            tags[name].post_count = Tag.post_count + delta
+
+
+def link_new_posts(tags_by_post):
+    # Links freshly inserted posts to their tags with one executemany, counting each tag once
+    counts = Counter(name for names in tags_by_post.values() for name in names)
+    if not counts:
+        return
+    tags = {tag.name: tag for tag in Tag.query.filter(Tag.name.in_(counts))}
+    for name, count in counts.items():
+        if name in tags:
+            tags[name].post_count = Tag.post_count + count
+        else:
+            tags[name] = Tag(name=name, post_count=count)
+            db.session.add(tags[name])
+    db.session.flush()
+    links = [{"post_id": post_id, "tag_id": tags[name].id} for post_id, names in tags_by_post.items() for name in names]
+    db.session.execute(post_tags.insert(), links)
+
+
+def migrate_tags():
+    # Fills post_tags from the comma-joined tags column for posts that predate the tag table,
+    # then recounts; running it again only picks up posts that are still unlinked
+    linked = select(post_tags.c.post_id)
+    rows = db.session.execute(
+        select(BlogPost.id, BlogPost.tags).where(BlogPost.tags != "", BlogPost.id.not_in(linked))
+    ).all()
+    if not rows:
+        return 0
+    names_by_post = {post_id: clean_tags(tags.split(",")) for post_id, tags in rows}
+    tag_ids = {tag.name: tag.id for tag in Tag.query}
+    for name in {name for names in names_by_post.values() for name in names} - set(tag_ids):
+        tag = Tag(name=name, post_count=0)
+        db.session.add(tag)
+        db.session.flush()
+        tag_ids[name] = tag.id
+    links = [{"post_id": post_id, "tag_id": tag_ids[name]} for post_id, names in names_by_post.items() for name in names]
+    if links:
+        db.session.execute(post_tags.insert(), links)
+    db.session.execute(text("UPDATE tag SET post_count = (SELECT count(*) FROM post_tags WHERE tag_id = tag.id)"))
+    db.session.commit()
+    return len(rows)
+
+
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# FTS5 index over the searchable columns. It is an external content table reading from
+# blog_post, and the triggers keep it in sync with every insert, update and delete
+SEARCH_INDEX_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5(
+        title, content, category, tags, content='blog_post', content_rowid='id')""",
+    """CREATE TRIGGER IF NOT EXISTS blog_post_fts_insert AFTER INSERT ON blog_post BEGIN
+        INSERT INTO blog_post_fts(rowid, title, content, category, tags)
+        VALUES (new.id, new.title, new.content, new.category, new.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS blog_post_fts_delete AFTER DELETE ON blog_post BEGIN
+        INSERT INTO blog_post_fts(blog_post_fts, rowid, title, content, category, tags)
+        VALUES ('delete', old.id, old.title, old.content, old.category, old.tags);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS blog_post_fts_update AFTER UPDATE ON blog_post BEGIN
+        INSERT INTO blog_post_fts(blog_post_fts, rowid, title, content, category, tags)
+        VALUES ('delete', old.id, old.title, old.content, old.category, old.tags);
+        INSERT INTO blog_post_fts(rowid, title, content, category, tags)
+        VALUES (new.id, new.title, new.content, new.category, new.tags);
+    END""",
+]
+
+_search_index_ready = None
+
+
+def init_search_index():
+    global _search_index_ready
+    created = "blog_post_fts" not in inspect(db.engine).get_table_names()
+    with db.engine.begin() as connection:
+        for statement in SEARCH_INDEX_DDL:
+            connection.execute(text(statement))
+        if created:
+            # Index the posts written before the search index existed
+            connection.execute(text("INSERT INTO blog_post_fts(blog_post_fts) VALUES ('rebuild')"))
+    _search_index_ready = True
+
+
+def search_index_ready():
+    global _search_index_ready
+    if _search_index_ready is None:
+        _search_index_ready = "blog_post_fts" in inspect(db.engine).get_table_names()
+    return _search_index_ready
+
+
+def fts_query(term):
+    # Every word of the term must match, as a prefix; quoting keeps FTS5 syntax out of user input
+    words = re.findall(r"\w+", term)
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_posts(term, limit, category = None, tag = None, fields = None):
+    query = fts_query(term)
+    if not query:
+        return []
+    # Filters join the matches to their posts by rowid, so they apply before ranking and the limit
+    conditions, params = [], {"query": query, "limit": limit}
+    if category:
+        conditions.append("blog_post.category = :category")
+        params["category"] = category
+    if tag:
+        conditions.append("blog_post.id IN (SELECT post_tags.post_id FROM post_tags "
+                          "JOIN tag ON tag.id = post_tags.tag_id WHERE tag.name = :tag)")
+        params["tag"] = tag
+    join = " JOIN blog_post ON blog_post.id = blog_post_fts.rowid" if conditions else ""
+    # bm25 ranks title matches above tag, category and content matches
+    rows = db.session.execute(text(
+        "SELECT blog_post_fts.rowid, snippet(blog_post_fts, -1, '<mark>', '</mark>', '...', 16) "
+        f"FROM blog_post_fts{join} WHERE blog_post_fts MATCH :query"
+        + "".join(f" AND {condition}" for condition in conditions) +
+        " ORDER BY bm25(blog_post_fts, 10.0, 1.0, 4.0, 4.0) LIMIT :limit"
+    ), params).all()
+    posts = BlogPost.query.filter(BlogPost.id.in_([row[0] for row in rows]))
+    if fields:
+        posts = posts.options(load_only(*[getattr(BlogPost, name) for name in dict.fromkeys(fields + ("id",))]))
+    posts = {post.id: post for post in posts}
+    matches = [(posts[post_id], snippet) for post_id, snippet in rows if post_id in posts]
+    results = (projected_schema(fields) if fields else posts_schema).dump([post for post, _ in matches])
+    for result, (_, snippet) in zip(results, matches):
+        result["snippet"] = snippet
+    return results
+
+
+CACHE_MAX_ENTRIES = 1024
+
+
+class ResponseCache:
+    # LRU of serialized GET responses. An entry for a single post is dropped when that post is
+    # written; listings and searches can include any post, so every write drops all of them
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry, version):
+        with self.lock:
+            # A write committed while this response was being built, so it may already be stale
+            if version != self.version:
+                return
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *post_ids):
+        with self.lock:
+            self.version += 1
+            stale = [key for key in self.entries if key[0] is None or key[0] in post_ids]
+            for key in stale:
+                del self.entries[key]
+
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES)
+
+
+def cached_response(view):
+    # Serves repeated GETs from response_cache without touching the database, and answers
+    # If-None-Match / If-Modified-Since with 304 from the cached validators
+    @wraps(view)
+    def wrapper(**kwargs):
+        key = (kwargs.get("id"), request.base_url, tuple(sorted(request.args.items(multi=True))))
+        entry = response_cache.get(key)
+        if entry is None:
+            version = response_cache.version
+            response, status = view(**kwargs)
+            if status != 200:
+                return response, status
+            if "ETag" not in response.headers:
+                response.add_etag()
+            entry = (response.get_data(), list(response.headers))
+            response_cache.put(key, entry, version)
+        body, headers = entry
+        return app.response_class(body, status=200, headers=headers).make_conditional(request)
+    return wrapper
+
+
+MAX_BULK_SIZE = 5000
+
+
+TEXT_FIELDS = ("title", "content", "category")
+
+
+def field_error(data, name, check_lengths):
+    # A null or non-string value would fail the NOT NULL constraint, or be stored as is, so it is
+    # a 400. SQLite doesn't enforce VARCHAR lengths, and the single-post routes never checked them;
+    # the bulk routes do, so a batch can't store more than the columns declare
+    value = data[name]
+    if not isinstance(value, str) or not value:
+        return f"{name} must be a non-empty string"
+    length = BlogPost.__table__.c[name].type.length
+    if check_lengths and length is not None and len(value) > length:
+        return f"{name} must be at most {length} characters"
+    return None
+
+
+def tags_error(tags, check_lengths):
+    tags = clean_tags(tags)
+    if tags is None:
+        return "tags must be a list of strings"
+    if check_lengths:
+        length = Tag.name.type.length
+        if any(len(tag) > length for tag in tags):
+            return f"tags must be at most {length} characters each"
+        length = BlogPost.tags.type.length
+        if len(",".join(tags)) > length:
+            return f"tags must be at most {length} characters joined by commas"
+    return None
+
+
+def create_error(data, check_lengths = False):
+    if not isinstance(data, dict) or not all(data.get(name) for name in TEXT_FIELDS):
+        return "Missing required fields"
+    for name in TEXT_FIELDS:
+        error = field_error(data, name, check_lengths)
+        if error:
+            return error
+    return tags_error(data.get("tags", []), check_lengths)
+
+
+def update_error(data, check_lengths = False):
+    if not isinstance(data, dict) or not data:
+        return "Invalid request body"
+    for name in TEXT_FIELDS:
+        error = field_error(data, name, check_lengths) if name in data else None
+        if error:
+            return error
+    if "tags" in data:
+        return tags_error(data["tags"], check_lengths)
+    return None
+
+
+def apply_update(post, data):
+    post.title = data.get("title", post.title)
+    post.content = data.get("content", post.content)
+    post.category = data.get("category", post.category)
+
 
 @app.route("/posts", methods=["POST"])
 def create_post():
     data = request.get_json()
-    if not data or not data.get("title") or not data.get("content") or not data.get("category"):
-        return jsonify({"error": "Missing required fields"}), 400
+    error = create_error(data)
+    if error:
+        return jsonify({"error": error}), 400
 
-    tags = ",".join(data.get("tags", []))
     new_post = BlogPost(
         title=data["title"],
         content=data["content"],
-        category=data["category"],
-        tags=tags
+        category=data["category"]
     )
     db.session.add(new_post)
+    set_post_tags(new_post, clean_tags(data.get("tags", [])))
     db.session.commit()
+    response_cache.invalidate(new_post.id)
     return post_schema.jsonify(new_post), 201
 
 @app.route("/posts", methods=["GET"])
+@cached_response
 def get_posts():
     term = request.args.get("term")
-    if term:
-        posts = BlogPost.query.filter(
-            (BlogPost.title.ilike(f"%{term}%")) |
-            (BlogPost.content.ilike(f"%{term}%")) |
-            (BlogPost.category.ilike(f"%{term}%"))
-        ).all()
+    if not term:
+        return list_posts()
+    # Search results are ranked by relevance, so there is no (createdAt, id) order to page through
+    if request.args.get("cursor") or request.args.get("order"):
+        return jsonify({"error": "cursor and order can't be combined with term"}), 400
+    fields = requested_fields()
+    if fields is not None and set(fields) - POST_FIELDS:
+        return unknown_fields_error(fields)
+    if search_index_ready():
+        limit = min(max(request.args.get("limit", SEARCH_LIMIT, type=int), 1), MAX_SEARCH_LIMIT)
+        return jsonify(search_posts(term, limit, request.args.get("category"), request.args.get("tag"), fields)), 200
+    posts = filter_posts(BlogPost.query).filter(
+        (BlogPost.title.ilike(f"%{term}%")) |
+        (BlogPost.content.ilike(f"%{term}%")) |
+        (BlogPost.category.ilike(f"%{term}%"))
+    ).all()
+    return jsonify(projected_schema(fields).dump(posts) if fields else posts_schema.dump(posts)), 200
+
+
+def requested_fields():
+    if not request.args.get("fields"):
+        return None
+    return tuple(dict.fromkeys(name.strip() for name in request.args["fields"].split(",") if name.strip()))
+
+
+def unknown_fields_error(fields):
+    return jsonify({"error": f"Unknown fields: {', '.join(sorted(set(fields) - POST_FIELDS))}"}), 400
+
+
+def filter_posts(query):
+    if request.args.get("category"):
+        query = query.filter(BlogPost.category == request.args["category"])
+    if request.args.get("tag"):
+        tagged = select(post_tags.c.post_id).join(Tag, Tag.id == post_tags.c.tag_id).where(Tag.name == request.args["tag"])
+        query = query.filter(BlogPost.id.in_(tagged))
+    return query
+
+
+def list_posts():
+    # One page in (createdAt, id) order. The next page starts after the last row of this one,
+    # so every page is an index range scan whatever its depth; its cursor is sent in headers
+    # so the body stays a plain list of posts
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    descending = request.args.get("order", "asc") == "desc"
+    fields = requested_fields()
+    if fields is not None and set(fields) - POST_FIELDS:
+        return unknown_fields_error(fields)
+
+    query = filter_posts(BlogPost.query)
+    if fields:
+        # Only the requested columns (plus the cursor key) are selected, so a listing can skip content
+        columns = dict.fromkeys(fields + ("id", "createdAt"))
+        query = query.options(load_only(*[getattr(BlogPost, name) for name in columns]))
+    key = tuple_(BlogPost.createdAt, BlogPost.id)
+    if request.args.get("cursor"):
+        try:
+            position = tuple_(*decode_cursor(request.args["cursor"]))
+        except (ValueError, TypeError):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(key < position if descending else key > position)
+    if descending:
+        query = query.order_by(BlogPost.createdAt.desc(), BlogPost.id.desc())
     else:
-        posts = BlogPost.query.all()
-    return posts_schema.jsonify(posts), 200
+        query = query.order_by(BlogPost.createdAt, BlogPost.id)
+
+    posts = query.limit(limit + 1).all()
+    response = jsonify(projected_schema(fields).dump(posts[:limit]) if fields else posts_schema.dump(posts[:limit]))
+    if len(posts) > limit:
+        cursor = encode_cursor(posts[limit - 1])
+        args = request.args.to_dict()
+        args.update(cursor=cursor, limit=limit)
+        next_url = f"{request.base_url}?{urlencode(args)}"
+        response.headers["X-Next-Cursor"] = cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
 
 
 @app.route("/posts/<int:id>", methods=["GET"])
+@cached_response
 def get_post(id):
     post = BlogPost.query.get(id)
     if not post:
         return jsonify({"error": "Post not found"}), 404
-    return post_schema.jsonify(post), 200
+    response = post_schema.jsonify(post)
+    if post.updatedAt:
+        # updatedAt changes on every write to the row, so it identifies this exact representation
+        response.set_etag(f"{post.id}-{post.updatedAt:%Y%m%d%H%M%S%f}")
+        response.last_modified = post.updatedAt
+    return response, 200
 
 
 @app.route("/posts/<int:id>", methods=["PUT"])
@@ -74,15 +491,16 @@ def update_post(id):
         return jsonify({"error": "Post not found"}), 404
 
     data = request.get_json()
-    if not data:
-        return jsonify({"error": "Invalid request body"}), 400
+    error = update_error(data)
+    if error:
+        return jsonify({"error": error}), 400
 
-    post.title = data.get("title", post.title)
-    post.content = data.get("content", post.content)
-    post.category = data.get("category", post.category)
-    post.tags = ",".join(data.get("tags", post.tags.split(",")))
+    apply_update(post, data)
+    if "tags" in data:
+        set_post_tags(post, clean_tags(data["tags"]))
 
     db.session.commit()
+    response_cache.invalidate(id)
     return post_schema.jsonify(post), 200
 
 
@@ -91,12 +509,142 @@ def delete_post(id):
     post = BlogPost.query.get(id)
     if not post:
         return jsonify({"error": "Post not found"}), 404
+    set_post_tags(post, [])
     db.session.delete(post)
     db.session.commit()
+    response_cache.invalidate(id)
     return "", 204
 
 
+def bulk_items():
+    items = request.get_json()
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"error": "Expected a non-empty list"}), 400)
+    if len(items) > MAX_BULK_SIZE:
+        return None, (jsonify({"error": f"At most {MAX_BULK_SIZE} items per request"}), 413)
+    return items, None
+
+
+def is_post_id(value):
+    # JSON true and false arrive as bools, which are ints too
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def load_posts(ids):
+    ids = [post_id for post_id in ids if is_post_id(post_id)]
+    query = BlogPost.query.options(selectinload(BlogPost.tag_list)).filter(BlogPost.id.in_(ids))
+    return {post.id: post for post in query}
+
+
+# The bulk routes validate every item, skip the invalid ones and apply the rest in one
+# transaction: one executemany per statement and one commit (one fsync) for the whole batch.
+# They answer with a result per item, in request order, carrying that item's status code
+
+
+@app.route("/posts/bulk", methods=["POST"])
+def create_posts():
+    items, error = bulk_items()
+    if error:
+        return error
+
+    now = datetime.utcnow()
+    results = []
+    created = []
+    rows = []
+    for index, data in enumerate(items):
+        error = create_error(data, check_lengths=True)
+        if error:
+            results.append({"index": index, "status": 400, "error": error})
+            continue
+        tags = clean_tags(data.get("tags", []))
+        result = {"index": index, "status": 201}
+        results.append(result)
+        created.append((result, tags))
+        rows.append({"title": data["title"], "content": data["content"], "category": data["category"],
+                     "tags": ",".join(tags), "createdAt": now, "updatedAt": now})
+
+    if rows:
+        # The ORM would insert row by row to read back each id; RETURNING hands them back from
+        # the batched insert, in the order of the rows
+        inserted = db.session.execute(
+            BlogPost.__table__.insert().returning(BlogPost.__table__.c.id, sort_by_parameter_order=True), rows)
+        for post_id, (result, _) in zip(inserted.scalars(), created):
+            result["id"] = post_id
+        link_new_posts({result["id"]: tags for result, tags in created})
+        db.session.commit()
+        response_cache.invalidate()
+    return jsonify(results), 200
+
+
+@app.route("/posts/bulk", methods=["PATCH"])
+def update_posts():
+    items, error = bulk_items()
+    if error:
+        return error
+
+    posts = load_posts(data.get("id") for data in items if isinstance(data, dict))
+    results = []
+    updated = []
+    changes = []
+    for index, data in enumerate(items):
+        post = posts.get(data.get("id")) if isinstance(data, dict) and is_post_id(data.get("id")) else None
+        if post is None:
+            results.append({"index": index, "status": 404, "error": "Post not found"})
+            continue
+        fields = {key: value for key, value in data.items() if key != "id"}
+        error = update_error(fields, check_lengths=True)
+        if error:
+            results.append({"index": index, "status": 400, "error": error})
+            continue
+        apply_update(post, fields)
+        if "tags" in fields:
+            changes.append((post, clean_tags(fields["tags"])))
+        updated.append(post.id)
+        results.append({"index": index, "status": 200, "id": post.id})
+
+    if updated:
+        set_tags(changes)
+        db.session.commit()
+        response_cache.invalidate(*updated)
+    return jsonify(results), 200
+
+
+@app.route("/posts/bulk", methods=["DELETE"])
+def delete_posts():
+    items, error = bulk_items()
+    if error:
+        return error
+
+    posts = load_posts(items)
+    results = []
+    deleted = []
+    for index, post_id in enumerate(items):
+        post = posts.pop(post_id, None) if is_post_id(post_id) else None
+        if post is None:
+            results.append({"index": index, "status": 404, "error": "Post not found"})
+            continue
+        deleted.append(post)
+        results.append({"index": index, "status": 204, "id": post_id})
+
+    if deleted:
+        set_tags([(post, []) for post in deleted])
+        for post in deleted:
+            db.session.delete(post)
+        db.session.commit()
+        response_cache.invalidate(*[result["id"] for result in results if result["status"] == 204])
+    return jsonify(results), 200
+
+
+@app.route("/tags", methods=["GET"])
+def get_tags():
+    tags = Tag.query.filter(Tag.post_count > 0).order_by(Tag.post_count.desc(), Tag.name).all()
+    return jsonify([{"name": tag.name, "count": tag.post_count} for tag in tags]), 200
+
+
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()  # create tables
+        create_indexes()
+        migrate_tags()
+        init_search_index()
     app.run(debug=True)
@@ -1,9 +1,20 @@
 import csv
+import gzip
+import math
 import os
+import sqlite3
 import sys
+import time
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from functools import lru_cache
+from itertools import compress
 import json
 
+from tracker_common import file_lock, file_version, iter_json_array, read_last_id, send_to_daemon, serve, write_json_atomic
+
 
 class Expense:
     def __init__(self, id, date, description, amount, category = None):
@@ -31,113 +42,1033 @@ class Expense:
                        category = data['category']
                        )
 
-class ExpenseTracker:
-    def __init__(self, storagefile = 'expenses.json'):
-        self.storagefile = storagefile
-        self.expenses = self.load_expenses()
+@lru_cache(maxsize=4096)
+def _month_key(date):
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').strftime('%Y-%m')
+    except (ValueError, TypeError):
+        return None
 
-    def load_expenses(self):
-        if not os.path.isfile(self.storagefile):
+
+class ExpenseAggregates:
+    # Running totals and counts per year-month, per category and per (year-month, category).
+    # Expenses with an unparseable date are left out, as summarize has always done.
+    def __init__(self):
+        self.by_month = defaultdict(lambda: [0.0, 0])
+        self.by_category = defaultdict(lambda: [0.0, 0])
+        self.by_month_category = defaultdict(lambda: defaultdict(lambda: [0.0, 0]))
+
+    def _apply(self, expense, sign):
+        month = _month_key(expense.date)
+        if month is None:
+            return
+        try:
+            amount = float(expense.amount) * sign
+        except (ValueError, TypeError):
+            return
+        for cell in (self.by_month[month], self.by_category[expense.category],
+                     self.by_month_category[month][expense.category]):
+            cell[0] += amount
+            cell[1] += sign
+
+    def add(self, expense):
+        self._apply(expense, 1)
+
+    def remove(self, expense):
+        self._apply(expense, -1)
+
+    def _months(self, month, year):
+        if month is None and year is None:
+            return None
+        if month is None:
+            return [f"{year}-{m:02d}" for m in range(1, 13)]
+        return [f"{year or datetime.now().strftime('%Y')}-{month}"]
+
+    def total(self, month = None, year = None):
+        months = self._months(month, year)
+        if months is None:
+            cells = self.by_month.values()
+        else:
+            cells = [self.by_month[m] for m in months if m in self.by_month]
+        return round(sum((cell[0] for cell in cells), 0.0), 2)
+
+    def breakdown(self, month = None, year = None):
+        months = self._months(month, year)
+        if months is None:
+            per_category = self.by_category
+        else:
+            per_category = defaultdict(lambda: [0.0, 0])
+            for m in months:
+                for category, cell in self.by_month_category.get(m, {}).items():
+                    per_category[category][0] += cell[0]
+                    per_category[category][1] += cell[1]
+        return {category: (round(total, 2), count)
+                for category, (total, count) in per_category.items() if count}
+
+
+def _build_store(store_factory, records):
+    store = store_factory()
+    for record in records:
+        store.add(Expense.from_json(record))
+    return store
+
+
+class JsonStorage:
+    def __init__(self, storagefile):
+        self.path = storagefile
+        self.last_id_path = os.path.splitext(storagefile)[0] + '.lastid'
+
+    def lock(self):
+        return file_lock(self.path + '.lock')
+
+    def version(self):
+        return file_version(self.path)
+
+    def last_id(self):
+        # The largest id ever handed out, as far as the saved expenses no longer show it
+        return read_last_id(self.last_id_path)
+
+    def load(self):
+        if not os.path.isfile(self.path):
             return []
 
-        with open(self.storagefile, 'r') as f:
+        with open(self.path, 'r') as f:
             try:
-                data = json.load(f)
-                return [Expense.from_json(expense) for expense in data]
+                return json.load(f)
             except json.JSONDecodeError:
                 return []
 
+    def iter_records(self):
+        if not os.path.isfile(self.path):
+            return iter(())
+        return iter_json_array(self.path)
+
+    def load_store(self, store_factory):
+        return _build_store(store_factory, self.load())
+
+    def apply(self, changes, expenses):
+        # A plain JSON document can only be rewritten as a whole
+        self.save(expenses, max(expense.id for _, expense in changes))
+
+    def save(self, expenses, last_id = 0):
+        # Only once the expense with the largest id is deleted does that id need keeping aside.
+        # Written first, so a crash in between can only skip an id, never reuse one
+        if last_id and expenses.get(last_id) is None and last_id > self.last_id():
+            write_json_atomic(self.last_id_path, last_id)
+        write_json_atomic(self.path, [expense.to_json() for expense in expenses], indent=4)
+
+    def rollback(self):
+        # Nothing is written before apply(), so the tracker undoes a failed batch itself
+        return False
+
+    def close(self):
+        pass
+
+
+class JournalStorage:
+    def __init__(self, storagefile, sync_every = 100, compact_every = 10000):
+        base = os.path.splitext(storagefile)[0]
+        self.path = base + '.journal'
+        self.snapshot_path = base + '.snapshot.json'
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self._journal = None
+        self._unsynced = 0
+        self._entries = 0
+        self._last_id = 0
+
+    def lock(self):
+        return file_lock(self.path + '.lock')
+
+    def version(self):
+        return file_version(self.snapshot_path), file_version(self.path)
+
+    def last_id(self):
+        # Deleted ids stay in the journal until compaction, which then writes a mark entry
+        return self._last_id
+
+    def load(self):
+        records = {}
+        if os.path.isfile(self.snapshot_path):
+            with open(self.snapshot_path, 'r') as f:
+                try:
+                    for record in json.load(f):
+                        records[record['id']] = record
+                except json.JSONDecodeError:
+                    pass
+
+        self._entries = 0
+        last_id = max(records, default=0)
+        if os.path.isfile(self.path):
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn write left behind by a crash
+                    if entry['op'] == 'mark':
+                        last_id = max(last_id, entry['last_id'])
+                        continue
+                    for replayed in entry['entries'] if entry['op'] == 'batch' else [entry]:
+                        last_id = max(last_id, self._replay(records, replayed))
+                    self._entries += 1
+        self._last_id = last_id
+        return list(records.values())
+
+    def iter_records(self):
+        # Journal entries can update or delete earlier records, so replay has to finish first
+        return iter(self.load())
+
+    def load_store(self, store_factory):
+        return _build_store(store_factory, self.load())
+
+    @staticmethod
+    def _replay(records, entry):
+        # Returns the id the entry touched
+        if entry['op'] == 'delete':
+            records.pop(entry['id'], None)
+            return entry['id']
+        records[entry['expense']['id']] = entry['expense']
+        return entry['expense']['id']
+
+    @staticmethod
+    def _entry(op, expense):
+        if op == 'delete':
+            return {'op': op, 'id': expense.id}
+        return {'op': op, 'expense': expense.to_json()}
+
+    def _open_journal(self):
+        if self._journal is None:
+            needs_newline = False
+            if os.path.isfile(self.path) and os.path.getsize(self.path) > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+            self._journal = open(self.path, 'a')
+            if needs_newline:
+                self._journal.write('\n')
+        return self._journal
+
+    def apply(self, changes, expenses):
+        journal = self._open_journal()
+        if len(changes) == 1:
+            journal.write(json.dumps(self._entry(*changes[0])) + '\n')
+        else:
+            # A batch is a single line, so a torn write drops the whole batch
+            entries = [self._entry(op, expense) for op, expense in changes]
+            journal.write(json.dumps({'op': 'batch', 'entries': entries}) + '\n')
+        journal.flush()
+
+        self._last_id = max(self._last_id, max(expense.id for _, expense in changes))
+        self._entries += len(changes)
+        self._unsynced += len(changes)
+        if self._unsynced >= self.sync_every or len(changes) > 1:
+            self._sync()
+        if self._entries >= self.compact_every:
+            self.save(expenses)
+
+    def _sync(self):
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = 0
+
+    def save(self, expenses, last_id = 0):
+        # Compaction: fold everything into a fresh snapshot, then start an empty journal.
+        # Replaying a stale journal over the new snapshot is harmless, so a crash
+        # between the two steps loses nothing.
+        write_json_atomic(self.snapshot_path, [expense.to_json() for expense in expenses])
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.path, 'w')
+        self._entries = 0
+        self._unsynced = 0
+        self._last_id = max(self._last_id, last_id)
+        if self._last_id and expenses.get(self._last_id) is None:
+            # The deleted ids are gone from the snapshot, so the largest one handed out is kept here
+            self._journal.write(json.dumps({'op': 'mark', 'last_id': self._last_id}) + '\n')
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+
+    def rollback(self):
+        return False
+
+    def close(self):
+        if self._journal is not None:
+            self._sync()
+            self._journal.close()
+            self._journal = None
+
+
+EXPORT_FIELDS = ['id', 'date', 'description', 'amount', 'category']
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_CHUNK_SIZE = 1000
+
+BACKEND_ENV_VAR = 'EXPENSE_TRACKER_BACKEND'
+COLUMNAR_ENV_VAR = 'EXPENSE_TRACKER_COLUMNAR'
+SOCKET_ENV_VAR = 'EXPENSE_TRACKER_SOCKET'
+DEFAULT_SOCKET = '.expense-tracker.sock'
+
+def _category_sort_key(expense):
+    return expense.category if expense.category is not None else ''
+
+
+class ExpenseStore:
+    # Default in-memory store: Expense objects keyed by id, plus per-category and aggregate indexes
+    def __init__(self):
+        self._clear()
+
+    def _clear(self):
+        self._expenses = {}
+        self._by_category = defaultdict(dict)
+        self._aggregates = ExpenseAggregates()
+
+    def __len__(self):
+        return len(self._expenses)
+
+    def __iter__(self):
+        return iter(self._expenses.values())
+
+    def max_id(self):
+        return max(self._expenses, default=0)
+
+    def get(self, expense_id):
+        return self._expenses.get(expense_id)
+
+    def add(self, expense):
+        self._expenses[expense.id] = expense
+        self._index(expense)
+
+    def replace(self, old, new):
+        self._unindex(old)
+        self._expenses[new.id] = new
+        self._index(new)
+
+    def remove(self, expense):
+        del self._expenses[expense.id]
+        self._unindex(expense)
+
+    def _index(self, expense):
+        self._by_category[expense.category][expense.id] = expense
+        self._aggregates.add(expense)
+
+    def _unindex(self, expense):
+        members = self._by_category[expense.category]
+        members.pop(expense.id, None)
+        if not members:
+            del self._by_category[expense.category]
+        self._aggregates.remove(expense)
+
+    def in_category(self, category):
+        return sorted(self._by_category.get(category, {}).values(), key=lambda expense: expense.id)
+
+    def sorted_by_category(self, reverse = False):
+        return sorted(self._expenses.values(), key=_category_sort_key, reverse=reverse)
+
+    def total(self, month = None, year = None):
+        return self._aggregates.total(month, year)
+
+    def breakdown(self, month = None, year = None):
+        return self._aggregates.breakdown(month, year)
+
+
+@lru_cache(maxsize=None)
+def _optional_numpy():
+    # Imported on first use only: it is optional, and too slow to import for every CLI call
+    try:
+        import numpy
+    except ImportError:  # the columnar store falls back to plain column loops
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=4096)
+def _date_ordinal(date):
+    try:
+        return datetime.strptime(date, '%Y-%m-%d').toordinal()
+    except (ValueError, TypeError):
+        return 0
+
+
+@lru_cache(maxsize=4096)
+def _ordinal_date(ordinal):
+    return datetime.fromordinal(ordinal).strftime('%Y-%m-%d')
+
+
+class ColumnarExpenseStore:
+    # Packed columns (one row per expense) instead of one Python object per expense.
+    # Categories are interned to small integer codes, dates kept as ordinals (0 when
+    # unparseable) and amounts as floats (NaN when not a number); a date or amount the
+    # column can't give back unchanged is also kept aside as it was, so saving never
+    # rewrites it. Deleted rows are tombstoned until enough of them pile up to be worth
+    # compacting.
+    COMPACT_MIN_DEAD = 1024
+
+    def __init__(self):
+        self.numpy = _optional_numpy()
+        self._clear()
+
+    def _clear(self):
+        self.ids = array('q')
+        self.dates = array('i')
+        self.amounts = array('d')
+        self.categories = array('i')
+        self.alive = array('b')
+        self.descriptions = []
+        self._raw_dates = {}
+        self._raw_amounts = {}
+        self._rows = {}
+        self._category_codes = {}
+        self._category_names = []
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        for row in range(len(self.ids)):
+            if self.alive[row]:
+                yield self._materialize(row)
+
+    def max_id(self):
+        return max(self._rows, default=0)
+
+    def _code(self, category):
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self._category_names)
+            self._category_names.append(category)
+        return code
+
+    def _materialize(self, row):
+        if row in self._raw_dates:
+            date = self._raw_dates[row]
+        else:
+            date = _ordinal_date(self.dates[row])
+        return Expense(id = self.ids[row],
+                       date = date,
+                       description = self.descriptions[row],
+                       amount = self._raw_amounts[row] if row in self._raw_amounts else self.amounts[row],
+                       category = self._category_names[self.categories[row]]
+                       )
+
+    def _write(self, row, expense):
+        ordinal = _date_ordinal(expense.date)
+        if ordinal and _ordinal_date(ordinal) == expense.date:
+            self._raw_dates.pop(row, None)
+        else:
+            self._raw_dates[row] = expense.date  # e.g. '2025-7-1' still counts for July
+        try:
+            amount = float(expense.amount)
+        except (ValueError, TypeError):
+            amount = math.nan
+        if type(expense.amount) is float:
+            self._raw_amounts.pop(row, None)
+        else:
+            self._raw_amounts[row] = expense.amount
+        self.dates[row] = ordinal
+        self.amounts[row] = amount
+        self.categories[row] = self._code(expense.category)
+        self.descriptions[row] = expense.description
+
+    def get(self, expense_id):
+        row = self._rows.get(expense_id)
+        return self._materialize(row) if row is not None else None
+
+    def add(self, expense):
+        row = len(self.ids)
+        self.ids.append(expense.id)
+        self.dates.append(0)
+        self.amounts.append(0.0)
+        self.categories.append(0)
+        self.alive.append(1)
+        self.descriptions.append(None)
+        self._write(row, expense)
+        self._rows[expense.id] = row
+
+    def replace(self, old, new):
+        self._write(self._rows[old.id], new)
+
+    def remove(self, expense):
+        row = self._rows.pop(expense.id)
+        self.alive[row] = 0
+        self.descriptions[row] = None
+        self._raw_dates.pop(row, None)
+        self._raw_amounts.pop(row, None)
+        self._dead += 1
+        if self._dead >= self.COMPACT_MIN_DEAD and self._dead * 2 > len(self.ids):
+            self._compact()
+
+    def _compact(self):
+        live = [row for row in range(len(self.ids)) if self.alive[row]]
+        raw_dates = {new_row: self._raw_dates[row] for new_row, row in enumerate(live) if row in self._raw_dates}
+        raw_amounts = {new_row: self._raw_amounts[row] for new_row, row in enumerate(live) if row in self._raw_amounts}
+        self.ids = array('q', (self.ids[row] for row in live))
+        self.dates = array('i', (self.dates[row] for row in live))
+        self.amounts = array('d', (self.amounts[row] for row in live))
+        self.categories = array('i', (self.categories[row] for row in live))
+        self.alive = array('b', [1]) * len(live)
+        self.descriptions = [self.descriptions[row] for row in live]
+        self._raw_dates = raw_dates
+        self._raw_amounts = raw_amounts
+        self._rows = {expense_id: row for row, expense_id in enumerate(self.ids)}
+        self._dead = 0
+
+    @staticmethod
+    def _date_range(month, year):
+        if month is None and year is None:
+            return 1, None
+        year = int(year or datetime.now().strftime('%Y'))
+        if month is None:
+            return datetime(year, 1, 1).toordinal(), datetime(year + 1, 1, 1).toordinal()
+        month = int(month)
+        end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+        return datetime(year, month, 1).toordinal(), end.toordinal()
+
+    def _selected_rows(self, month, year):
+        # Row mask for live rows with a valid amount whose date falls into the range
+        np = self.numpy
+        start, end = self._date_range(month, year)
+        if np is not None:
+            dates = np.frombuffer(self.dates, dtype=np.int32)
+            amounts = np.frombuffer(self.amounts, dtype=np.float64)
+            mask = np.frombuffer(self.alive, dtype=np.int8).astype(bool)
+            mask &= dates >= start
+            if end is not None:
+                mask &= dates < end
+            return mask & ~np.isnan(amounts)
+        end = end if end is not None else math.inf
+        return array('b', (alive and start <= date < end and amount == amount
+                           for alive, date, amount in zip(self.alive, self.dates, self.amounts)))
+
+    def total(self, month = None, year = None):
+        np = self.numpy
+        mask = self._selected_rows(month, year)
+        if np is not None:
+            return round(float(np.frombuffer(self.amounts, dtype=np.float64)[mask].sum()), 2)
+        return round(math.fsum(compress(self.amounts, mask)), 2)
+
+    def breakdown(self, month = None, year = None):
+        np = self.numpy
+        mask = self._selected_rows(month, year)
+        size = len(self._category_names)
+        if np is not None:
+            codes = np.frombuffer(self.categories, dtype=np.int32)[mask]
+            amounts = np.frombuffer(self.amounts, dtype=np.float64)[mask]
+            totals = np.bincount(codes, weights=amounts, minlength=size).tolist()
+            counts = np.bincount(codes, minlength=size).tolist()
+        else:
+            totals = [0.0] * size
+            counts = [0] * size
+            for code, amount in zip(compress(self.categories, mask), compress(self.amounts, mask)):
+                totals[code] += amount
+                counts[code] += 1
+        return {self._category_names[code]: (round(totals[code], 2), counts[code])
+                for code in range(size) if counts[code]}
+
+    def in_category(self, category):
+        np = self.numpy
+        code = self._category_codes.get(category)
+        if code is None:
+            return []
+        if np is not None:
+            mask = np.frombuffer(self.categories, dtype=np.int32) == code
+            mask &= np.frombuffer(self.alive, dtype=np.int8).astype(bool)
+            rows = np.flatnonzero(mask).tolist()
+        else:
+            rows = [row for row, (row_code, alive) in enumerate(zip(self.categories, self.alive))
+                    if alive and row_code == code]
+        return [self._materialize(row) for row in rows]
+
+    def sorted_by_category(self, reverse = False):
+        # Rank the (few) distinct categories once, then order rows by their rank
+        np = self.numpy
+        keys = [name if name is not None else '' for name in self._category_names]
+        positions = {key: position for position, key in enumerate(sorted(set(keys)))}
+        rank = [positions[key] for key in keys]
+        if np is not None:
+            ranks = np.asarray(rank, dtype=np.int64)[np.frombuffer(self.categories, dtype=np.int32)]
+            rows = np.flatnonzero(np.frombuffer(self.alive, dtype=np.int8))
+            ranks = ranks[rows]
+            order = np.argsort(-ranks if reverse else ranks, kind='stable')
+            rows = rows[order].tolist()
+        else:
+            rows = sorted((row for row in range(len(self.ids)) if self.alive[row]),
+                          key=lambda row: rank[self.categories[row]], reverse=reverse)
+        return (self._materialize(row) for row in rows)
+
+
+def _date_bounds(month, year):
+    # Half-open [start, end) ISO date range for a month or a whole year, matching ExpenseAggregates
+    if month is None and year is None:
+        return None, None
+    year = int(year or datetime.now().strftime('%Y'))
+    if month is None:
+        return f"{year:04d}-01-01", f"{year + 1:04d}-01-01"
+    month = int(month)
+    end = f"{year + 1:04d}-01-01" if month == 12 else f"{year:04d}-{month + 1:02d}-01"
+    return f"{year:04d}-{month:02d}-01", end
+
+
+class SqliteStorage:
+    # Keeps expenses in an indexed SQLite table and doubles as the tracker's store, so
+    # filtering, aggregation and ordering run as SQL instead of over Python objects.
+    # Store methods write inside the open transaction; apply() commits it.
+    COLUMNS = 'id, date, description, amount, category'
+    # The largest id ever handed out: the largest one left, or a larger deleted one kept in meta
+    LAST_ID = ("MAX((SELECT COALESCE(MAX(id), 0) FROM expenses), "
+               "(SELECT COALESCE(MAX(value), 0) FROM meta WHERE key = 'last_id'))")
+    VALID_DATE = "date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+
+    def __init__(self, storagefile):
+        self.path = os.path.splitext(storagefile)[0] + '.db'
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript('''
+            CREATE TABLE IF NOT EXISTS expenses (
+                id INTEGER PRIMARY KEY,
+                date TEXT,
+                description TEXT,
+                amount REAL,
+                category TEXT
+            );
+            CREATE INDEX IF NOT EXISTS expenses_date ON expenses (date);
+            CREATE INDEX IF NOT EXISTS expenses_category ON expenses (category);
+            CREATE INDEX IF NOT EXISTS expenses_amount ON expenses (amount);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER
+            );
+        ''')
+
+    @staticmethod
+    def _expense(row):
+        return Expense(id = row[0], date = row[1], description = row[2], amount = row[3], category = row[4])
+
+    @staticmethod
+    def _row(expense):
+        return expense.id, expense.date, expense.description, expense.amount, expense.category
+
+    # Storage interface. SQLite does its own locking, and every reader sees committed
+    # rows, so there is never a stale copy to reconcile.
+    def lock(self):
+        return nullcontext()
+
+    def version(self):
+        return None
+
+    def load(self):
+        return list(self.iter_records())
+
+    def iter_records(self):
+        for row in self.connection.execute(f'SELECT {self.COLUMNS} FROM expenses ORDER BY id'):
+            yield self._expense(row).to_json()
+
+    def load_store(self, store_factory):
+        return self
+
+    def last_id(self):
+        return self.connection.execute(f'SELECT {self.LAST_ID}').fetchone()[0]
+
+    def _keep_last_id(self, last_id):
+        self.connection.execute("INSERT INTO meta (key, value) VALUES ('last_id', ?) "
+                                "ON CONFLICT (key) DO UPDATE SET value = MAX(value, excluded.value)", (last_id,))
+
+    def apply(self, changes, expenses):
+        self.connection.commit()
+
+    def rollback(self):
+        # The store is this connection's open transaction, so a failed batch just drops it
+        self.connection.rollback()
+        return True
+
+    def save(self, expenses, last_id = 0):
+        if expenses is not self:
+            rows = [self._row(expense) for expense in expenses]
+            self.connection.execute('DELETE FROM expenses')
+            self.connection.executemany(f'INSERT INTO expenses ({self.COLUMNS}) VALUES (?, ?, ?, ?, ?)', rows)
+        if last_id:
+            self._keep_last_id(last_id)
+        self.connection.commit()
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    # Store interface
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM expenses').fetchone()[0]
+
+    def __bool__(self):
+        return self.connection.execute('SELECT 1 FROM expenses LIMIT 1').fetchone() is not None
+
+    def __iter__(self):
+        return (self._expense(row) for row in
+                self.connection.execute(f'SELECT {self.COLUMNS} FROM expenses ORDER BY id'))
+
+    def max_id(self):
+        return self.connection.execute('SELECT MAX(id) FROM expenses').fetchone()[0] or 0
+
+    def get(self, expense_id):
+        row = self.connection.execute(f'SELECT {self.COLUMNS} FROM expenses WHERE id = ?', (expense_id,)).fetchone()
+        return self._expense(row) if row is not None else None
+
+    def add(self, expense):
+        # The id is settled by the INSERT itself, under the write lock: an id another process
+        # has handed out since we allocated it (even one deleted since) moves past all of them
+        cursor = self.connection.execute(f'INSERT INTO expenses ({self.COLUMNS}) '
+                                         f'VALUES (MAX(?, {self.LAST_ID} + 1), ?, ?, ?, ?)', self._row(expense))
+        expense.id = cursor.lastrowid
+
+    def replace(self, old, new):
+        self.connection.execute('UPDATE expenses SET date = ?, description = ?, amount = ?, category = ? WHERE id = ?',
+                                self._row(new)[1:] + (old.id,))
+
+    def remove(self, expense):
+        self.connection.execute('DELETE FROM expenses WHERE id = ?', (expense.id,))
+        self._keep_last_id(expense.id)
+
+    def in_category(self, category):
+        rows = self.connection.execute(f'SELECT {self.COLUMNS} FROM expenses WHERE category IS ? ORDER BY id', (category,))
+        return [self._expense(row) for row in rows]
+
+    def sorted_by_category(self, reverse = False):
+        # NULL sorts first ascending and last descending, just like None mapped to ''
+        rows = self.connection.execute(f'SELECT {self.COLUMNS} FROM expenses '
+                                       f'ORDER BY category {"DESC" if reverse else "ASC"}, id')
+        return (self._expense(row) for row in rows)
+
+    def _where(self, month, year):
+        start, end = _date_bounds(month, year)
+        if start is None:
+            return f'WHERE {self.VALID_DATE}', ()
+        return f'WHERE date >= ? AND date < ? AND {self.VALID_DATE}', (start, end)
+
+    def total(self, month = None, year = None):
+        where, params = self._where(month, year)
+        total = self.connection.execute(f'SELECT TOTAL(amount) FROM expenses {where}', params).fetchone()[0]
+        return round(total, 2)
+
+    def breakdown(self, month = None, year = None):
+        where, params = self._where(month, year)
+        rows = self.connection.execute(f'SELECT category, TOTAL(amount), COUNT(*) FROM expenses {where} '
+                                       f'GROUP BY category', params)
+        return {category: (round(total, 2), count) for category, total, count in rows}
+
+
+STORAGE_BACKENDS = {
+    'json': JsonStorage,
+    'journal': JournalStorage,
+    'sqlite': SqliteStorage,
+}
+
+
+def open_storage(backend, storagefile):
+    if backend not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend: '{backend}'")
+    return STORAGE_BACKENDS[backend](storagefile)
+
+
+class ExpenseTracker:
+    def __init__(self, storagefile = 'expenses.json', storage = None, columnar = False, lazy = False):
+        self.storagefile = storagefile
+        self.storage = storage if storage is not None else JsonStorage(storagefile)
+        self.store_factory = ColumnarExpenseStore if columnar else ExpenseStore
+        self._loaded = None
+        self._version = None
+        self._next_id = 1
+        self._pending = None
+        if not lazy:
+            self.load_expenses()
+
+    @property
+    def _store(self):
+        # Lazy trackers only parse the storage once a command really needs the full state
+        if self._loaded is None:
+            self.load_expenses()
+        return self._loaded
+
+    def _records(self):
+        # Read-only commands stream straight from storage until something forces a full load
+        if self._loaded is None:
+            return (Expense.from_json(record) for record in self.storage.iter_records())
+        return iter(self._loaded)
+
+    def _aggregated(self):
+        if self._loaded is not None:
+            return self._loaded, bool(self._loaded)
+        aggregates = ExpenseAggregates()
+        found = False
+        for expense in self._records():
+            aggregates.add(expense)
+            found = True
+        return aggregates, found
+
+    @property
+    def expenses(self):
+        return list(self._store)
+
+    def load_expenses(self):
+        # Taken before reading, so a write that lands mid-read still shows up as a newer version
+        self._version = self.storage.version()
+        self._loaded = self.storage.load_store(self.store_factory)
+        self._next_id = max(self._loaded.max_id(), self.storage.last_id()) + 1
+
     def save_expenses(self):
-        with open(self.storagefile, 'w') as f:
-            json.dump([expense.to_json() for expense in self.expenses], f, indent=4)
+        with self.storage.lock():
+            self.storage.save(self._store, self._next_id - 1)
+            self._version = self.storage.version()
+
+    def _commit(self, op, expense, previous = None):
+        if self._pending is not None:
+            # previous is the expense an update replaced, kept so a failed batch can undo it
+            self._pending.append((op, expense, previous))
+            return
+        self._persist([(op, expense)])
+
+    def _persist(self, changes):
+        # Optimistic concurrency: if another process wrote since we loaded, replay our
+        # changes on top of its state instead of overwriting it
+        with self.storage.lock():
+            if self.storage.version() != self._version:
+                changes = self._reconcile(changes)
+            if changes:
+                self.storage.apply(changes, self._store)
+            self._version = self.storage.version()
+
+    def _reconcile(self, changes):
+        self.load_expenses()
+        store = self._loaded
+        next_free = self._next_id
+        applied = []
+        for op, expense in changes:
+            current = store.get(expense.id)
+            if op == 'add':
+                if current is not None or expense.id < next_free:
+                    expense.id = self._get_next_id()  # another writer handed the id out meanwhile
+                store.add(expense)
+            elif current is None:
+                continue  # updated or deleted a record that another writer already deleted
+            elif op == 'update':
+                store.replace(current, expense)
+            else:
+                store.remove(current)
+            applied.append((op, expense))
+        self._next_id = max(self._next_id, store.max_id() + 1)
+        return applied
+
+    @contextmanager
+    def batch(self):
+        if self._pending is not None:
+            # Nested batches fold into the outermost one
+            yield self
+            return
+
+        next_id = self._next_id
+        self._pending = changes = []
+        store = None
+        try:
+            yield self
+            self._pending = None
+            store = self._loaded
+            if changes:
+                self._persist([(op, expense) for op, expense, _ in changes])
+        except BaseException:
+            # Whether the body or the write failed, none of the batch may stay in memory,
+            # or the next successful write would save it after all
+            self._pending = None
+            self._undo(changes, store, next_id)
+            raise
+
+    def _undo(self, changes, store, next_id):
+        if store is not None and self._loaded is not store:
+            # _persist reconciled onto a fresh load, which the undo log no longer describes
+            self.storage.rollback()
+            self.load_expenses()
+            return
+        self._next_id = next_id
+        if self.storage.rollback():
+            return
+        # Undo the batch's own changes newest first, so rolling back costs as much as the batch
+        store = self._store
+        for op, expense, previous in reversed(changes):
+            if op == 'add':
+                store.remove(expense)
+            elif op == 'update':
+                store.replace(expense, previous)
+            else:
+                store.add(expense)
+
+    def close(self):
+        self.storage.close()
+
+    def refresh(self):
+        # Picks up writes made by other processes since the last load
+        if self._loaded is not None and self.storage.version() != self._version:
+            self.load_expenses()
+
+    def migrate(self, backend):
+        target = open_storage(backend, self.storagefile)
+        with target.lock():
+            target.save(self._store, self._next_id - 1)
+        self.storage.close()
+        self.storage = target
+        self.load_expenses()
+        print(f"Expenses migrated to '{backend}' storage")
 
     def _get_next_id(self):
-        return max((expense.id for expense in self.expenses), default=0) + 1
+        # Ids are handed out monotonically and the largest is persisted, so a deleted id is never reused
+        if self._loaded is None:
+            self.load_expenses()
+        next_id = self._next_id
+        self._next_id += 1
+        return next_id
 
     def _find_by_id(self, expense_id):
-        for expense in self.expenses:
-            if expense.id == expense_id:
-                return expense
-        return None
+        return self._store.get(expense_id)
 
-    def add_expense(self, description, amount, category = None):
+    def _add(self, description, amount, category = None, date = None):
         expense = Expense(
             id = self._get_next_id(),
-            date = datetime.now().strftime('%Y-%m-%d'),
+            date = date or datetime.now().strftime('%Y-%m-%d'),
             description = description,
             amount = float(amount),
             category = category
         )
-        self.expenses.append(expense)
-        self.save_expenses()
+        self._store.add(expense)
+        self._next_id = max(self._next_id, expense.id + 1)
+        self._commit('add', expense)
+        return expense
+
+    def add_expense(self, description, amount, category = None):
+        self._add(description, amount, category)
         print(f"expense successfully added")
 
+    def import_expenses(self, path):
+        count = 0
+        try:
+            with open(path, 'r', newline='') as f:
+                if path.lower().endswith('.csv'):
+                    rows = csv.DictReader(f)
+                else:
+                    rows = (json.loads(line) for line in f if line.strip())
+
+                with self.batch():
+                    for row in rows:
+                        self._add(row['description'], row['amount'], row.get('category') or None, row.get('date') or None)
+                        count += 1
+        except (OSError, KeyError, ValueError, TypeError) as e:
+            print(f"Import failed at record {count + 1}, nothing was saved: {e!r}")
+            return
+
+        print(f"{count} expenses successfully imported")
+
     def update_expense(self, id, description, amount, category):
         expense = self._find_by_id(id)
         if expense:
-            expense.description = description
-            expense.amount = float(amount)
-            expense.category = category
-            self.save_expenses()
+            updated = Expense(id = expense.id,
+                              date = expense.date,
+                              description = description,
+                              amount = float(amount),
+                              category = category
+                              )
+            self._store.replace(expense, updated)
+            self._commit('update', updated, expense)
             print(f"Expense successfully updated")
         else:
             print(f"Expense not found")
 
     def view_expenses(self, category_status = None):
 
-        filtered = self.expenses
-
-        if category_status is not None:
-            filtered = [expense for expense in filtered if expense.category == category_status]
-
-        if not filtered:
-            print("No expenses found")
-            return
+        if category_status is not None and self._loaded is not None:
+            filtered = self._loaded.in_category(category_status)
+        else:
+            filtered = self._records()
+            if category_status is not None:
+                filtered = (expense for expense in filtered if expense.category == category_status)
 
+        found = False
         for expense in filtered:
+            found = True
             print(f"{expense.id}: {expense.date}| {expense.description} | {expense.amount} | {expense.category}")
 
+        if not found:
+            print("No expenses found")
+
     def delete_expense(self, id):
         expense = self._find_by_id(id)
         if expense:
-            self.expenses.remove(expense)
-            self.save_expenses()
+            self._store.remove(expense)
+            self._commit('delete', expense)
             print(f"Expense successfully deleted")
         else:
             print(f"Expense not found")
 
-    def summarize_expenses(self, chosen_month=None):
-        all_expenses = self.expenses
+    def summarize_expenses(self, chosen_month=None, year=None):
+        aggregates, found = self._aggregated()
+        if not found:
+            print("No expenses found")
+            return
 
-        if not all_expenses:
+        total = aggregates.total(chosen_month, year)
+        print(f"Total expenses value: {total}")
+
+    def breakdown_expenses(self, chosen_month=None, year=None):
+        breakdown = self._aggregated()[0].breakdown(chosen_month, year)
+        if not breakdown:
             print("No expenses found")
             return
 
-        total = 0.0
+        for category, (total, count) in sorted(breakdown.items(), key=lambda item: item[1][0], reverse=True):
+            display_category = category if category is not None else "N/A"
+            print(f"{display_category}: {total} ({count} expense{'s' if count != 1 else ''})")
 
-        for expense in all_expenses:
-            try:
-                date_obj = datetime.strptime(expense.date, '%Y-%m-%d')
-                amount = float(expense.amount)
-            except (ValueError, TypeError):
+    def iter_expenses(self, category = None, start = None, end = None):
+        # Valid dates are ISO formatted, so plain string comparison orders them correctly
+        for expense in self._records():
+            if category is not None and expense.category != category:
                 continue
+            if start is not None or end is not None:
+                if not _date_ordinal(expense.date):
+                    continue
+                if (start is not None and expense.date < start) or (end is not None and expense.date > end):
+                    continue
+            yield expense
 
-            if chosen_month:
-                if date_obj.strftime('%m') == chosen_month and date_obj.strftime('%Y') == datetime.now().strftime('%Y'):
-                    total += amount
+    def export_expenses(self, path, fmt = 'csv', compressed = False, category = None, start = None, end = None):
+        opener = gzip.open if compressed else open
+        rows = 0
+        started = time.perf_counter()
+        with opener(path, 'wt', newline='') as f:
+            if fmt == 'csv':
+                writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+                writer.writeheader()
+                write_chunk = writer.writerows
             else:
-                total += amount
+                def write_chunk(chunk):
+                    f.writelines(json.dumps(record) + '\n' for record in chunk)
 
-        print(f"Total expenses value: {total}")
+            chunk = []
+            for expense in self.iter_expenses(category, start, end):
+                chunk.append(expense.to_json())
+                if len(chunk) >= EXPORT_CHUNK_SIZE:
+                    write_chunk(chunk)
+                    rows += len(chunk)
+                    chunk = []
+            if chunk:
+                write_chunk(chunk)
+                rows += len(chunk)
+
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed > 0 else 0
+        print(f"Exported {rows} expenses to {path} in {elapsed:.2f}s ({rate:.0f} rows/sec)")
 
     def sort_by_category(self, sort_order = 'asc'):
-        if not self.expenses:
+        if not self._store:
             print("No expenses to sort.")
             return
 
-        sorted_expenses = sorted(self.expenses,
-                                 key=lambda expense: expense.category if expense.category is not None else '',
-                                 reverse=(sort_order == "desc"))
+        sorted_expenses = self._store.sorted_by_category(reverse=(sort_order == "desc"))
 
         for expense in sorted_expenses:
             display_category = expense.category if expense.category is not None else "N/A"
@@ -153,9 +1084,12 @@ class CLIHandler:
             "delete" : self._delete_expense,
             "view" : self._view_expenses,
             "summarize" : self._summarize_expenses,
+            "breakdown" : self._breakdown_expenses,
             "help" : self._print_help,
             "export" : self._export_to_csv,
             "sort": self._sort_by_category,
+            "migrate": self._migrate_storage,
+            "import": self._import_expenses,
         }
 
     @staticmethod
@@ -246,15 +1180,37 @@ class CLIHandler:
             return
         self.expense_tracker.delete_expense(expense_id)
 
+    @staticmethod
+    def _parse_month_and_year(args):
+        if len(args) > 2:
+            raise ValueError("too many arguments")
+        month = year = None
+        if args and args[0].lower() != "all":
+            month = int(args[0])
+            if not 1 <= month <= 12:
+                raise ValueError(f"invalid month: {args[0]}")
+            month = f"{month:02d}"
+        if len(args) == 2:
+            year = f"{int(args[1]):04d}"
+        return month, year
+
     def _summarize_expenses(self, args):
-        if len(args) == 1:
-            month = args[0]
-            self.expense_tracker.summarize_expenses(month)
-        elif not args:
-            self.expense_tracker.summarize_expenses()
-        else:
-            print("Usage: summarize [month_number]")
-            print("Example: summarize 07 (for July)")
+        try:
+            month, year = self._parse_month_and_year(args)
+        except ValueError:
+            print("Usage: summarize [month_number|all] [year]")
+            print("Example: summarize 07 (for July), summarize all 2024")
+            return
+        self.expense_tracker.summarize_expenses(month, year)
+
+    def _breakdown_expenses(self, args):
+        try:
+            month, year = self._parse_month_and_year(args)
+        except ValueError:
+            print("Usage: breakdown [month_number|all] [year]")
+            print("Example: breakdown 07 2024")
+            return
+        self.expense_tracker.breakdown_expenses(month, year)
 
     def _print_help(self, args = None):
         print("""
@@ -267,39 +1223,107 @@ class CLIHandler:
                                              Example: view or view Groceries
           delete <id>                    - Delete an expense by its ID.
                                              Example: delete 5
-          summarize [month_number]       - Show total expenses (all or for a specific month).
-                                             Example: summarize 07 (for July)
+          summarize [month_number|all] [year] - Show total expenses (all, a month or a whole year).
+                                             Example: summarize 07 (for July), summarize all 2024
+          breakdown [month_number|all] [year] - Show totals per category.
+                                             Example: breakdown 07 2024
           sort [asc|desc]               - Sort expenses by category.
                                              Example: sort desc
           help                           - Show this help message.
+          serve                          - Keep expenses in memory and answer commands from other
+                                             invocations over a Unix socket (started from the command line).
           exit/quit                      - Exit the application.
-          export                         - Export expenses to a CSV file.
+          export [path] [options]        - Export expenses (default: expenses.csv).
+                                             Options: --format csv|jsonl, --gzip, --category <name>,
+                                                      --from YYYY-MM-DD, --to YYYY-MM-DD
+                                             Example: export food.jsonl.gz --category Food --from 2025-01-01
+          import <file.csv|file.jsonl>   - Import expenses (description, amount, [category], [date]).
+                                             Example: import bank-2025-07.csv
+          migrate <json|journal|sqlite>  - Move expenses to another storage backend.
+                                             Example: migrate journal
         --------------------------------
                 """)
 
     @staticmethod
-    def _export_to_csv(self, args = None):
-        with open("expenses.json", "r") as f:
-            json_data = json.load(f)
+    def _parse_export_args(args):
+        options = {'path': None, 'fmt': None, 'compressed': False, 'category': None, 'start': None, 'end': None}
+        flags = {'--format': 'fmt', '--category': 'category', '--from': 'start', '--to': 'end'}
+        args = list(args)
+        while args:
+            arg = args.pop(0)
+            if arg == '--gzip':
+                options['compressed'] = True
+            elif arg in flags:
+                if not args:
+                    raise ValueError(f"{arg} needs a value")
+                options[flags[arg]] = args.pop(0)
+            elif arg.startswith('--') or options['path'] is not None:
+                raise ValueError(f"unexpected argument: {arg}")
+            else:
+                options['path'] = arg
 
-        if json_data:
-            headers = json_data[0].keys()
+        path = options['path'] or 'expenses.csv'
+        if path.endswith('.gz'):
+            options['compressed'] = True
+            path_stem = path[:-3]
         else:
-            headers = []
+            path_stem = path
+        if options['fmt'] is None:
+            options['fmt'] = 'jsonl' if path_stem.endswith(('.jsonl', '.ndjson')) else 'csv'
+        if options['fmt'] not in EXPORT_FORMATS:
+            raise ValueError(f"unknown format: {options['fmt']}")
+        if options['compressed'] and not path.endswith('.gz'):
+            path += '.gz'
+        for key in ('start', 'end'):
+            if options[key] is not None:
+                datetime.strptime(options[key], '%Y-%m-%d')
+        options['path'] = path
+        return options
 
-        with open("expenses.csv", "w",newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(json_data)
+    def _export_to_csv(self, args = None):
+        try:
+            options = self._parse_export_args(args or [])
+        except ValueError as e:
+            print(f"Invalid export arguments: {e}")
+            print("Usage: export [path] [--format csv|jsonl] [--gzip] [--category <name>] [--from YYYY-MM-DD] [--to YYYY-MM-DD]")
+            return
+        self.expense_tracker.export_expenses(**options)
 
     def _sort_by_category(self, sort_order = "asc"):
         self.expense_tracker.sort_by_category(sort_order)
 
+    def _import_expenses(self, args):
+        if len(args) != 1:
+            print("Usage: import <file.csv|file.jsonl>")
+            return
+        self.expense_tracker.import_expenses(args[0])
+
+    def _migrate_storage(self, args):
+        if len(args) != 1 or args[0] not in STORAGE_BACKENDS:
+            print(f"Usage: migrate <{'|'.join(STORAGE_BACKENDS)}>")
+            return
+        self.expense_tracker.migrate(args[0])
+        print(f"Set {BACKEND_ENV_VAR}={args[0]} to keep using it on the next run")
+
 
 def main():
-    expense_tracker = ExpenseTracker()
+    socket_path = os.path.abspath(os.environ.get(SOCKET_ENV_VAR, DEFAULT_SOCKET))
+    if len(sys.argv) > 1 and sys.argv[1] != 'serve' and send_to_daemon(" ".join(sys.argv[1:]).split(), socket_path):
+        return
+
+    backend = os.environ.get(BACKEND_ENV_VAR, 'json')
+    columnar = os.environ.get(COLUMNAR_ENV_VAR, '') not in ('', '0')
+    # One-shot invocations load lazily, so 'help' or a streamed 'view' never pays for a full parse.
+    # SQLite opens instantly and answers queries itself, so it has nothing to defer.
+    expense_tracker = ExpenseTracker(storage=open_storage(backend, 'expenses.json'), columnar=columnar,
+                                     lazy=len(sys.argv) > 1 and backend != 'sqlite' and sys.argv[1] != 'serve')
     cli = CLIHandler(expense_tracker)
 
+    if sys.argv[1:] == ['serve']:
+        serve(cli, expense_tracker.refresh, socket_path)
+        expense_tracker.close()
+        return
+
     if len(sys.argv) == 1:
         print("Enter your commands to proceed:")
         cli._print_help()
@@ -331,5 +1355,7 @@ def main():
             print(f"Error parsing command line arguments: {e}")
             print("Ensure quoted arguments are correctly closed.")
 
+    expense_tracker.close()
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
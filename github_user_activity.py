@@ -21,44 +21,319 @@
 
 
 
-import sys
-import urllib.request
-import urllib.error
+import argparse
+import hashlib
+import http.client
 import json
-from datetime import datetime
+import os
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
 
 
-def fetch_user_events(username):
-    url = f"https://api.github.com/users/{username}/events"
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+API_TOKEN = os.environ.get("GITHUB_TOKEN")
+CACHE_DIR = os.environ.get("GITHUB_ACTIVITY_CACHE", ".github-activity-cache")
+STATE_FILE = os.environ.get("GITHUB_ACTIVITY_STATE", ".github-activity-state.json")
+CACHE_TTL = 60  # seconds a cached response is used without asking GitHub at all
+CACHE_MAX_ENTRIES = 5000
+CACHE_EVICT_EVERY = 100  # puts between two eviction passes
+PAGE_SIZE = 100  # the largest page the events API serves
+MAX_ATTEMPTS = 4
+RATE_LIMIT_PACE_BELOW = 100  # remaining requests below which requests get spaced out
+MAX_RATE_LIMIT_WAIT = 300  # seconds; a longer wait is reported as a rate limit error instead
+DEFAULT_POLL_INTERVAL = 60
 
-    try:
-        request = urllib.request.Request(url, headers={"User-Agent": "github-activity-cli"})
-        with urllib.request.urlopen(request) as response:
-            if response.getcode() == 200:
-                return json.loads(response.read().decode())
+
+class FetchError(Exception):
+    pass
+
+
+class ResponseCache:
+    # One JSON file per URL holding the body and its validators. A file's mtime is its last
+    # use, so the least recently used entries are the ones evicted once the cache is full
+    def __init__(self, directory = CACHE_DIR, ttl = CACHE_TTL, max_entries = CACHE_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._puts = 0
+
+    def _path(self, url):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + ".json")
+
+    def get(self, url):
+        path = self._path(url)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("url") == url else None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def put(self, url, entry):
+        entry = dict(entry, url=url, fetched_at=time.time())
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+            self._puts += 1
+            if self._puts % CACHE_EVICT_EVERY == 1:
+                self._evict()
+        except OSError:
+            pass  # caching is best effort
+
+    def _evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for item in it:
+                if item.name.endswith(".json"):
+                    entries.append((item.stat().st_mtime, item.path))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class RateLimiter:
+    # Shared by all worker threads. Follows X-RateLimit-Remaining/Reset: once the remaining
+    # budget runs low, requests are spaced out so that it lasts until the reset
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.remaining = None
+        self.reset = 0.0
+        self._next_slot = 0.0
+
+    def update(self, headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            with self._lock:
+                self.remaining = int(remaining)
+                self.reset = float(reset)
+        except ValueError:
+            pass
+
+    def wait(self):
+        with self._lock:
+            now = time.time()
+            if self.remaining is None or self.remaining >= RATE_LIMIT_PACE_BELOW or self.reset <= now:
+                return
+            interval = (self.reset - now) / max(self.remaining, 1)
+            slot = max(now if self.remaining > 0 else self.reset, self._next_slot)
+            self._next_slot = slot + interval
+            self.remaining -= 1  # counts requests in flight until a response corrects it
+        if slot - now > MAX_RATE_LIMIT_WAIT:
+            raise FetchError("Error: API rate limit exceeded. Please try again later.")
+        time.sleep(slot - now)
+
+    def backoff(self, headers, attempt):
+        # Seconds to wait before retrying a 403/429, or None when it is not worth waiting
+        try:
+            if headers.get("Retry-After") is not None:
+                delay = float(headers["Retry-After"])
+            elif headers.get("X-RateLimit-Remaining") == "0":
+                delay = float(headers.get("X-RateLimit-Reset", 0)) - time.time()
             else:
-                print(f"Error: Received status code {response.getcode()}")
-                return None
-    except urllib.error.HTTPError as e:
-        if e.code == 404:
-            print(f"Error: User '{username}' not found.")
-        elif e.code == 403:
-            print("Error: API rate limit exceeded. Please try again later.")
-        else:
-            print(f"HTTP Error: {e.reason}")
-        return None
-    except urllib.error.URLError as e:
-        print(f"Network Error: {e.reason}")
-        return None
-    except json.JSONDecodeError:
-        print("Error: Invalid response from GitHub API.")
+                delay = 2 ** attempt  # secondary limits don't always say how long to wait
+        except ValueError:
+            delay = 2 ** attempt
+        return max(delay, 0) if delay <= MAX_RATE_LIMIT_WAIT else None
+
+
+RATE_LIMITER = RateLimiter()
+_local = threading.local()
+
+
+def _connection(scheme, netloc):
+    # Keep-alive connections are kept per thread and host, so a batch reuses one TLS
+    # session per worker instead of opening one per request
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    connection = connections.get((scheme, netloc))
+    if connection is None:
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        connection = connections[(scheme, netloc)] = connection_class(netloc, timeout=30)
+    return connection
+
+
+def _get(url, headers):
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else "")
+    connection = _connection(parts.scheme, parts.netloc)
+    for attempt in range(2):
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.headers, response.read()
+        except (http.client.HTTPException, ConnectionError):
+            connection.close()  # the server dropped the idle connection; reopen it once
+            if attempt:
+                raise
+
+
+def _response_meta(headers, previous = None):
+    meta = dict(previous or {})
+    if headers.get("Link") is not None or previous is None:
+        meta["link"] = headers.get("Link")
+    try:
+        meta["poll_interval"] = int(headers["X-Poll-Interval"])
+    except (KeyError, TypeError, ValueError):
+        meta.setdefault("poll_interval", None)
+    return meta
+
+
+def _fetch_json(url, cache = None, not_found = "Error: Not found."):
+    # Returns the decoded body and the response's pagination link and poll interval
+    headers = {"User-Agent": "github-activity-cli", "Accept": "application/vnd.github+json"}
+    if API_TOKEN:
+        headers["Authorization"] = f"Bearer {API_TOKEN}"
+
+    entry = cache.get(url) if cache is not None else None
+    if entry is not None:
+        if cache.is_fresh(entry):
+            return entry["body"], entry.get("meta") or {}
+        # Conditional request: a 304 answer costs no rate limit and carries no body
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    for attempt in range(MAX_ATTEMPTS):
+        RATE_LIMITER.wait()
+        try:
+            status, response_headers, data = _get(url, headers)
+        except (http.client.HTTPException, OSError) as e:
+            raise FetchError(f"Network Error: {e}")
+        RATE_LIMITER.update(response_headers)
+
+        if status == 200:
+            try:
+                body = json.loads(data.decode())
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                raise FetchError("Error: Invalid response from GitHub API.")
+            meta = _response_meta(response_headers)
+            if cache is not None:
+                cache.put(url, {"etag": response_headers.get("ETag"),
+                                "last_modified": response_headers.get("Last-Modified"),
+                                "meta": meta,
+                                "body": body})
+            return body, meta
+        if status == 304 and entry is not None:
+            entry["meta"] = _response_meta(response_headers, entry.get("meta") or {})
+            cache.put(url, entry)
+            return entry["body"], entry["meta"]
+        if attempt + 1 < MAX_ATTEMPTS:
+            if status in (403, 429):
+                delay = RATE_LIMITER.backoff(response_headers, attempt)
+                if delay is not None:
+                    time.sleep(delay)
+                    continue
+            elif status >= 500:
+                time.sleep(2 ** attempt)
+                continue
+        break
+
+    if status == 404:
+        raise FetchError(not_found)
+    if status in (403, 429):
+        raise FetchError("Error: API rate limit exceeded. Please try again later.")
+    raise FetchError(f"HTTP Error: {http.client.responses.get(status, status)}")
+
+
+_NEXT_LINK = re.compile(r'<([^>]+)>\s*;\s*rel="next"')
+
+
+def _iter_pages(username, cache = None, page_size = PAGE_SIZE):
+    # Follows the Link header one page at a time, so a caller that stops early never
+    # fetches the remaining pages and at most one page is held in memory
+    url = f"{API_URL}/users/{username}/events?per_page={page_size}"
+    while url:
+        events, meta = _fetch_json(url, cache, not_found = f"Error: User '{username}' not found.")
+        yield events, meta
+        match = _NEXT_LINK.search(meta.get("link") or "")
+        url = match.group(1) if match else None
+
+
+def iter_user_events(username, cache = None, page_size = PAGE_SIZE):
+    for events, _ in _iter_pages(username, cache, page_size):
+        yield from events
+
+
+def _is_seen(event_id, last_seen_id):
+    if event_id == last_seen_id:
+        return True
+    return event_id.isdigit() and last_seen_id.isdigit() and int(event_id) <= int(last_seen_id)
+
+
+def poll_new_events(username, last_seen_id, cache = None, limit = 10):
+    # Events newer than last_seen_id, newest first. Pages are only followed while every event
+    # on them is new, so an unchanged feed costs one conditional request (a 304). Without a
+    # last seen id only the latest `limit` events count as new
+    new_events = []
+    poll_interval = None
+    for events, meta in _iter_pages(username, cache):
+        if poll_interval is None:
+            poll_interval = meta.get("poll_interval")
+        for event in events:
+            if last_seen_id is None and len(new_events) >= limit:
+                return new_events, poll_interval
+            if last_seen_id is not None and _is_seen(str(event["id"]), last_seen_id):
+                return new_events, poll_interval
+            new_events.append(event)
+    return new_events, poll_interval
+
+
+def load_state(path = STATE_FILE):
+    # {username: id of the newest event already shown}
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path = STATE_FILE):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def fetch_user_events(username, cache = None):
+    try:
+        return _fetch_json(f"{API_URL}/users/{username}/events", cache,
+                           not_found = f"Error: User '{username}' not found.")[0]
+    except FetchError as e:
+        print(e)
         return None
 
 
 def format_event(event):
     event_type = event["type"]
     repo_name = event["repo"]["name"]
-    created_at = datetime.strptime(event["created_at"], "%Y-%m-%dT%H:%M:%SZ").strftime("%Y-%m-%d %H:%M:%S")
+    # "2025-08-01T10:15:00Z" -> "2025-08-01 10:15:00" without a strptime/strftime round trip
+    raw_created_at = event["created_at"]
+    created_at = f"{raw_created_at[:10]} {raw_created_at[11:19]}"
 
     if event_type == "PushEvent":
         commit_count = len(event["payload"]["commits"])
@@ -81,20 +356,172 @@ def format_event(event):
         return f"{event_type} in {repo_name} at {created_at}"
 
 
+class EventSummary:
+    # Aggregates computed while the events stream past, without keeping the events
+    def __init__(self):
+        self.events = 0
+        self.pushes = defaultdict(int)
+        self.commits = defaultdict(int)
+        self.per_day = defaultdict(lambda: defaultdict(int))
+
+    def add(self, event):
+        self.events += 1
+        event_type = event["type"]
+        self.per_day[event["created_at"][:10]][event_type] += 1
+        if event_type == "PushEvent":
+            repo_name = event["repo"]["name"]
+            payload = event["payload"]
+            self.pushes[repo_name] += 1
+            self.commits[repo_name] += payload.get("size", len(payload.get("commits", ())))
+
+    def lines(self):
+        yield f"\nSummary of {self.events} event{'s' if self.events != 1 else ''}:"
+        if self.pushes:
+            yield "Pushes per repository:"
+            for repo_name, pushes in sorted(self.pushes.items(), key=lambda item: (-item[1], item[0])):
+                yield f"  {repo_name}: {pushes} push{'es' if pushes != 1 else ''}, {self.commits[repo_name]} commits"
+        yield "Events per day:"
+        for day in sorted(self.per_day, reverse=True):
+            counts = ", ".join(f"{event_type} {count}" for event_type, count in sorted(self.per_day[day].items()))
+            yield f"  {day}: {counts}"
+
+
+def activity_lines(username, cache = None, limit = 10, summarize = False):
+    # Yields the report line by line as pages arrive. The first page is fetched before
+    # anything is yielded, so an unknown user fails before the header is printed
+    events = iter_user_events(username, cache, min(limit, PAGE_SIZE) if limit and not summarize else PAGE_SIZE)
+    first = next(events, None)
+    if first is None:
+        return
+    yield f"\nRecent activity for {username}:"
+    yield "-" * 50
+    summary = EventSummary() if summarize else None
+    events = chain([first], events)
+    if summary is None:
+        for event in islice(events, limit or None):
+            yield format_event(event)
+        return
+    for shown, event in enumerate(events):
+        summary.add(event)
+        if not limit or shown < limit:
+            yield format_event(event)
+    yield from summary.lines()
+
+
+def _read_usernames(path):
+    with (sys.stdin if path == "-" else open(path, "r")) as f:
+        for line in f:
+            username = line.strip()
+            if username and not username.startswith("#"):
+                yield username
+
+
+def run_batch(path, workers, limit = 10, summarize = False):
+    # Fetches concurrently and prints each user as soon as their report is complete; the
+    # printing stays on this thread so the output of two users never interleaves
+    cache = ResponseCache()
+    failed = 0
+
+    def fetch(username):
+        lines = []
+        try:
+            lines.extend(activity_lines(username, cache, limit, summarize))
+        except FetchError as e:
+            return username, lines, str(e)
+        return username, lines, None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(fetch, username) for username in _read_usernames(path)]
+        for future in as_completed(futures):
+            username, lines, error = future.result()
+            if lines:
+                print("\n".join(lines))
+            if error is not None:
+                failed += 1
+                print(f"\n{username}: {error}")
+            sys.stdout.flush()
+    return failed
+
+
+def watch(usernames, workers, interval = None, limit = 10, once = False):
+    # Polls every user, prints only events not shown before (oldest first) and remembers the
+    # newest id per user in STATE_FILE. Waits as long as GitHub's X-Poll-Interval asks, or
+    # `interval` seconds when that is longer
+    state = load_state()
+    cache = ResponseCache(ttl=0)  # always revalidate; unchanged feeds come back as 304s
+
+    def poll(username):
+        try:
+            events, poll_interval = poll_new_events(username, state.get(username), cache, limit)
+        except FetchError as e:
+            return username, [], None, str(e)
+        return username, events, poll_interval, None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                wait = interval or 0
+                futures = [pool.submit(poll, username) for username in usernames]
+                for future in as_completed(futures):
+                    username, events, poll_interval, error = future.result()
+                    if error is not None:
+                        print(f"{username}: {error}")
+                        continue
+                    if events:
+                        state[username] = str(events[0]["id"])
+                    for event in reversed(events):
+                        print(f"{username}: {format_event(event)}")
+                    wait = max(wait, poll_interval or 0)
+                    sys.stdout.flush()
+                save_state(state)
+                if once:
+                    return
+                time.sleep(wait or DEFAULT_POLL_INTERVAL)
+        except KeyboardInterrupt:
+            save_state(state)
+            print("\nStopped watching.")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Show the recent public activity of GitHub users.")
+    parser.add_argument("username", nargs="?", help="GitHub username (asked for when omitted)")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="file with one username per line ('-' for stdin), fetched concurrently")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests in batch mode (default 8)")
+    parser.add_argument("--limit", type=int, default=10, help="events listed per user, 0 for all pages (default 10)")
+    parser.add_argument("--summary", action="store_true",
+                        help="also summarize the full history: pushes and commits per repository, events per day")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep polling and print only new events, as often as X-Poll-Interval allows")
+    parser.add_argument("--interval", type=int, metavar="SECONDS",
+                        help="seconds between --watch polls, when longer than X-Poll-Interval")
+    parser.add_argument("--new", action="store_true",
+                        help="print only the events not shown by a previous --watch/--new run, then exit")
+    args = parser.parse_args()
+    limit = max(args.limit, 0)
+
+    if args.watch or args.new:
+        usernames = list(_read_usernames(args.batch)) if args.batch else [args.username or input("Enter GitHub username: ")]
+        watch(usernames, max(args.workers, 1), args.interval or None, limit or 10, once=args.new)
+        return
 
-    username = input("Enter GitHub username: ")
+    if args.batch:
+        sys.exit(1 if run_batch(args.batch, max(args.workers, 1), limit, args.summary) else 0)
+
+    username = args.username or input("Enter GitHub username: ")
     print(f"Fetching recent activity for {username}...")
 
-    events = fetch_user_events(username)
-    if not events:
+    printed = False
+    try:
+        for line in activity_lines(username, ResponseCache(), limit, args.summary):
+            print(line)
+            printed = True
+    except FetchError as e:
+        print(e)
+        sys.exit(1)
+    if not printed:
         sys.exit(1)
-
-    print(f"\nRecent activity for {username}:")
-    print("-" * 50)
-    for event in events[:10]:
-        print(format_event(event))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,17 +1,137 @@
 import datetime
+import heapq
 import json
 import os
+import re
 import sys
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from functools import lru_cache
+from itertools import islice
+
+from tracker_common import (file_lock, file_version, iter_json_array, read_last_id, send_to_daemon, serve,
+                            stat_version, write_json_atomic)
+
+
+STATUSES = ['todo', 'in progress', 'done']
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _status_code(status):
+    # Statuses are interned as small ints; one the tracker doesn't know yet gets the next code
+    code = STATUS_CODES.get(status)
+    if code is None:
+        code = STATUS_CODES[status] = len(STATUSES)
+        STATUSES.append(status)
+    return code
+
+
+@lru_cache(maxsize=4096)
+def _ordinal_day(ordinal):
+    return datetime.date.fromordinal(ordinal).isoformat()
+
+
+_TWO_DIGITS = [f"{n:02d}" for n in range(60)]
+
+
+def _encode_time(text):
+    # "YYYY-MM-DD HH:MM:SS" becomes seconds since 0001-01-01. Anything else is kept verbatim
+    # (non-strings wrapped in a tuple) so saving never rewrites what was loaded
+    if type(text) is not str:
+        return (text,)
+    if len(text) == 19 and text[10] == ' ' and text[4] == text[7] == '-' and text[13] == text[16] == ':':
+        try:
+            moment = datetime.datetime.fromisoformat(text)
+        except ValueError:
+            return text
+        return moment.toordinal() * 86400 + moment.hour * 3600 + moment.minute * 60 + moment.second
+    return text
+
+
+def _decode_time(value):
+    if type(value) is int:
+        days, seconds = divmod(value, 86400)
+        return (f"{_ordinal_day(days)} {_TWO_DIGITS[seconds // 3600]}:"
+                f"{_TWO_DIGITS[seconds // 60 % 60]}:{_TWO_DIGITS[seconds % 60]}")
+    return value[0] if type(value) is tuple else value
+
+
+def _time_key(value):
+    # Timestamps that could not be encoded sort before every real one
+    return value if type(value) is int else -1
+
+
+def _now():
+    now = datetime.datetime.now()
+    return now.toordinal() * 86400 + now.hour * 3600 + now.minute * 60 + now.second
 
 
 class Task:
+    # Status is kept as an interned code and timestamps as integer seconds, encoded on first
+    # use. The strings of the JSON schema are kept until the field changes, so loading and
+    # saving never parse or format a timestamp that nothing looked at
+    __slots__ = ('id', 'description', 'status_code', '_created_ts', '_updated_ts', '_created_at', '_update_at')
+
     def __init__(self, id, description, status, created_at, update_at):
         self.id = id
         self.description = description
-        self.status = status
+        self.status_code = _status_code(status)
         self.created_at = created_at
         self.update_at = update_at
 
+    @property
+    def status(self):
+        return STATUSES[self.status_code]
+
+    @status.setter
+    def status(self, status):
+        self.status_code = _status_code(status)
+
+    @property
+    def created_ts(self):
+        if self._created_ts is None:
+            self._created_ts = _encode_time(self._created_at)
+        return self._created_ts
+
+    @created_ts.setter
+    def created_ts(self, created_ts):
+        self._created_ts = created_ts
+        self._created_at = None
+
+    @property
+    def created_at(self):
+        if self._created_at is None:
+            self._created_at = _decode_time(self._created_ts)
+        return self._created_at
+
+    @created_at.setter
+    def created_at(self, created_at):
+        self._created_at = created_at
+        self._created_ts = None
+
+    @property
+    def updated_ts(self):
+        if self._updated_ts is None:
+            self._updated_ts = _encode_time(self._update_at)
+        return self._updated_ts
+
+    @updated_ts.setter
+    def updated_ts(self, updated_ts):
+        self._updated_ts = updated_ts
+        self._update_at = None
+
+    @property
+    def update_at(self):
+        if self._update_at is None:
+            self._update_at = _decode_time(self._updated_ts)
+        return self._update_at
+
+    @update_at.setter
+    def update_at(self, update_at):
+        self._update_at = update_at
+        self._updated_ts = None
+
     def to_json(self):
         return {
             "id": self.id,
@@ -32,34 +152,598 @@ class Task:
         )
 
 
+SOCKET_ENV_VAR = 'TASK_TRACKER_SOCKET'
+DEFAULT_SOCKET = '.task-tracker.sock'
+AUTOSAVE_ENV_VAR = 'TASK_TRACKER_AUTOSAVE_MS'
+DEFAULT_AUTOSAVE_MS = 250
+
+# The search index log is folded into the saved index by a search once it outgrows the first
+# size, and dropped along with the index (rebuilt by the next search) past the second
+INDEX_LOG_COMPACT_BYTES = 256 * 1024
+INDEX_LOG_MAX_BYTES = 16 * 1024 * 1024
+
+# Time keys pack the timestamp and the id into one int, which sorts and bisects much
+# faster than a (timestamp, id) tuple; ids are assumed to fit in the low bits
+_ID_BITS = 40
+_ID_MASK = (1 << _ID_BITS) - 1
+
+SORT_KEYS = {
+    'id': lambda task: task.id,
+    'created': lambda task: (_time_key(task.created_ts) << _ID_BITS) + task.id,
+    'updated': lambda task: (_time_key(task.updated_ts) << _ID_BITS) + task.id,
+}
+
+
+class TaskIndex:
+    # Per-status lists of sort keys kept in order, so a page of "list <status>"
+    # costs a slice of the list instead of a scan over every task
+    def __init__(self, tasks = ()):
+        self._keys = defaultdict(lambda: {sort: [] for sort in SORT_KEYS})
+        for task in tasks:
+            for sort, key in SORT_KEYS.items():
+                self._keys[task.status_code][sort].append(key(task))
+        for by_sort in self._keys.values():
+            for keys in by_sort.values():
+                keys.sort()
+
+    def add(self, task):
+        for sort, key in SORT_KEYS.items():
+            insort(self._keys[task.status_code][sort], key(task))
+
+    def remove(self, task):
+        # Must run before any indexed field of the task changes
+        for sort, key in SORT_KEYS.items():
+            keys = self._keys[task.status_code][sort]
+            del keys[bisect_left(keys, key(task))]
+
+    def page(self, status = None, sort = 'id', offset = 0, limit = None, reverse = False):
+        codes = [STATUS_CODES.get(status)] if status is not None else list(self._keys)
+        lists = [self._keys[code][sort] for code in codes if code in self._keys]
+        stop = offset + limit if limit is not None else None
+        if len(lists) == 1:
+            keys = lists[0]
+            if reverse:
+                start = max(len(keys) - stop, 0) if stop is not None else 0
+                selected = keys[start:max(len(keys) - offset, 0)][::-1]
+            else:
+                selected = keys[offset:stop]
+        else:
+            merged = heapq.merge(*[reversed(keys) if reverse else keys for keys in lists], reverse=reverse)
+            selected = islice(merged, offset, stop)
+        return [key if sort == 'id' else key & _ID_MASK for key in selected]
+
+
+_TOKEN_RE = re.compile(r'\w+')
+
+
+def _tokenize(text):
+    return set(_TOKEN_RE.findall(text.lower()))
+
+
+class SearchIndex:
+    # Inverted index from description tokens to task ids. The vocabulary is also kept sorted,
+    # so a prefix term is a bisect into it instead of a scan over the tasks
+    def __init__(self, tasks = (), postings = None):
+        if postings is None:
+            postings = defaultdict(set)
+            for task in tasks:
+                for token in _tokenize(task.description):
+                    postings[token].add(task.id)
+        self._postings = dict(postings)
+        self._tokens = sorted(self._postings)
+
+    def add(self, task):
+        for token in _tokenize(task.description):
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                insort(self._tokens, token)
+            ids.add(task.id)
+
+    def remove(self, task):
+        # Must run before the description of the task changes
+        for token in _tokenize(task.description):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(task.id)
+            if not ids:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+
+    def _matching(self, term):
+        # Every token starting with the term counts, so "gro" finds "groceries"
+        tokens = self._tokens
+        start = stop = bisect_left(tokens, term)
+        while stop < len(tokens) and tokens[stop].startswith(term):
+            stop += 1
+        if stop - start == 1:
+            return self._postings[tokens[start]]
+        return set().union(*[self._postings[token] for token in tokens[start:stop]])
+
+    def search(self, query):
+        terms = _tokenize(query)
+        if not terms:
+            return []
+        matches = sorted((self._matching(term) for term in terms), key=len)
+        return sorted(matches[0].intersection(*matches[1:]))
+
+    def apply(self, added, removed):
+        # Folds in a logged delta: task ids to add to or remove from each token
+        for token, ids in removed.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.difference_update(ids)
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect_left(self._tokens, token)]
+        for token, ids in added.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                insort(self._tokens, token)
+            postings.update(ids)
+
+    def to_json(self):
+        return {token: sorted(ids) for token, ids in self._postings.items()}
+
+    @staticmethod
+    def from_json(json_dict):
+        return SearchIndex(postings = {token: set(ids) for token, ids in json_dict.items()})
+
+
+class TaskStats:
+    # Rollups over the history log, advanced incrementally from the byte offset they were
+    # last computed up to, so stats never re-reads events it has already counted
+    def __init__(self, offset = 0, events = 0, done_per_day = None, cycle_count = 0,
+                 cycle_seconds = 0, cycle_hours = None):
+        self.offset = offset
+        self.events = events
+        self.done_per_day = defaultdict(int, done_per_day or {})
+        self.cycle_count = cycle_count
+        self.cycle_seconds = cycle_seconds
+        self.cycle_hours = defaultdict(int, cycle_hours or {})
+
+    def add(self, event):
+        self.events += 1
+        if event.get('to') != 'done' or event.get('from') == 'done':
+            return
+        self.done_per_day[event['at'][:10]] += 1
+        done_ts = _encode_time(event['at'])
+        created_ts = _encode_time(event.get('created'))
+        if type(done_ts) is int and type(created_ts) is int:
+            seconds = max(done_ts - created_ts, 0)
+            self.cycle_count += 1
+            self.cycle_seconds += seconds
+            self.cycle_hours[seconds // 3600] += 1
+
+    def median_cycle_hours(self):
+        remaining = self.cycle_count // 2
+        for hours in sorted(self.cycle_hours):
+            remaining -= self.cycle_hours[hours]
+            if remaining < 0:
+                return hours
+        return None
+
+    def to_json(self):
+        return {
+            "offset": self.offset,
+            "events": self.events,
+            "done_per_day": self.done_per_day,
+            "cycle_count": self.cycle_count,
+            "cycle_seconds": self.cycle_seconds,
+            "cycle_hours": {str(hours): count for hours, count in self.cycle_hours.items()}
+        }
+
+    @staticmethod
+    def from_json(json_dict):
+        return TaskStats(
+            offset = json_dict["offset"],
+            events = json_dict["events"],
+            done_per_day = json_dict["done_per_day"],
+            cycle_count = json_dict["cycle_count"],
+            cycle_seconds = json_dict["cycle_seconds"],
+            cycle_hours = {int(hours): count for hours, count in json_dict["cycle_hours"].items()}
+        )
+
+
+def _format_duration(seconds):
+    days, seconds = divmod(int(seconds), 86400)
+    hours, seconds = divmod(seconds, 3600)
+    return f"{days}d {hours}h" if days else f"{hours}h {seconds // 60}m"
+
+
+def _format_task(task):
+    return f"[{task.id}]{task.description} | {task.status} | Created: {task.created_at} | Updated: {task.update_at}"
+
+
 class TaskTracker:
-    def __init__(self, storagefile = 'storage.json'):
+    def __init__(self, storagefile = 'storage.json', lazy = False, autosave_ms = None):
         self.storagefile = storagefile
-        self.tasks = self.load_tasks()
+        self.indexfile = os.path.splitext(storagefile)[0] + '.index.json'
+        self.indexlogfile = os.path.splitext(storagefile)[0] + '.index.log'
+        self.historyfile = os.path.splitext(storagefile)[0] + '.history.jsonl'
+        self.statsfile = os.path.splitext(storagefile)[0] + '.stats.json'
+        self.lastidfile = os.path.splitext(storagefile)[0] + '.lastid'
+        self._loaded = None
+        self._index = None
+        self._search = None
+        # Tokens each task changed since the last write had on disk, for the search index log
+        self._search_touched = {}
+        self._version = None
+        self._next_id = 1
+        # Held while commands touch the tasks, so the autosave thread never snapshots a half-done change
+        self.mutex = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._pending = []
+        self._autosave_thread = None
+        self._closing = threading.Event()
+        if not lazy:
+            self.load_tasks()
+        if autosave_ms:
+            # Write-behind: changes are queued and written by a background thread at most
+            # every autosave_ms, instead of one synchronous write per command
+            self._autosave_thread = threading.Thread(target=self._autosave, args=(autosave_ms / 1000,), daemon=True)
+            self._autosave_thread.start()
 
-    def load_tasks(self):
+    @property
+    def _tasks(self):
+        # Parsed on first use, so a lazy tracker only reads every task when a command needs them all
+        if self._loaded is None:
+            self.load_tasks()
+        return self._loaded
+
+    def _records(self):
+        # An id-ordered list streams tasks from the file while nothing is loaded
+        if self._loaded is not None:
+            return iter(self._loaded.values())
         if not os.path.exists(self.storagefile):
-            return []
+            return iter(())
+        return (Task.from_json(task_data) for task_data in iter_json_array(self.storagefile))
 
-        with open(self.storagefile, 'r') as f:
-            try:
-                data = json.load(f)
-                return [Task.from_json(task_data) for task_data in data]
-            except json.JSONDecodeError:
-                return []
+    @property
+    def tasks(self):
+        return list(self._tasks.values())
+
+    def refresh(self):
+        # Run by the daemon before every command, so it sees what one-shot invocations wrote
+        if self._loaded is not None and file_version(self.storagefile) != self._version:
+            self.load_tasks()
+
+    def load_tasks(self):
+        # Taken before reading, so a file created meanwhile still shows up as a newer version
+        version = file_version(self.storagefile)
+        tasks = {}
+        if os.path.exists(self.storagefile):
+            with open(self.storagefile, 'r') as f:
+                # Writes replace the file, so the opened one is exactly the version being read
+                version = stat_version(os.fstat(f.fileno()))
+                try:
+                    data = json.load(f)
+                except json.JSONDecodeError:
+                    data = []
+            for task_data in data:
+                task = Task.from_json(task_data)
+                tasks[task.id] = task
+        # Only stamped once every task parsed, so a file that failed to load still counts as
+        # changed and the next flush reconciles with it again instead of overwriting it
+        self._version = version
+        self._loaded = tasks
+        self._index = None  # built by the first command that pages or selects by status
+        self._search = None  # reloaded from indexfile, or rebuilt, by the next search
+        self._next_id = max(max(tasks, default=0), read_last_id(self.lastidfile)) + 1
 
     def save_tasks(self):
-        with open(self.storagefile, 'w') as f:
-            json.dump([task.to_json() for task in self.tasks], f, indent=4)
+        with file_lock(self.storagefile + '.lock'):
+            self._write_tasks()
+            self._search_touched = {}
+        # A full save has no delta to log, so the saved index is only kept valid by saving it too
+        if self._search is not None:
+            self._save_search_index()
+
+    def _write_tasks(self):
+        self._write_records([task.to_json() for task in self._tasks.values()], self._deleted_last_id())
+
+    def _deleted_last_id(self):
+        # The largest id handed out, if its task is gone and the storage no longer shows it
+        last_id = self._next_id - 1
+        return last_id if last_id not in self._tasks else 0
+
+    def _write_records(self, records, last_id = 0):
+        # The deleted largest id is kept aside first, so a crash in between can only skip an id
+        if last_id > read_last_id(self.lastidfile):
+            write_json_atomic(self.lastidfile, last_id)
+        write_json_atomic(self.storagefile, records, indent=4)
+        self._version = file_version(self.storagefile)
+
+    def _autosave(self, interval):
+        while not self._closing.wait(interval):
+            if self._pending:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"\nAutosave failed, will retry: {e}")
+
+    def flush(self):
+        # Writes the changes queued in write-behind mode. Only the snapshot is taken under the
+        # mutex; the slow disk write runs outside it so the REPL keeps answering meanwhile.
+        # The mutex is always taken first, so a command calling flush cannot deadlock the thread
+        mutex = self.mutex
+        mutex.acquire()
+        failed = None
+        changes, touched = self._pending, {}
+        try:
+            with self._flush_lock, file_lock(self.storagefile + '.lock'):
+                self._pending = []
+                try:
+                    if changes and file_version(self.storagefile) != self._version:
+                        changes = self._reconcile(changes)
+                    if not changes:
+                        return False
+                    records = [task.to_json() for task in self._tasks.values()]
+                    last_id = self._deleted_last_id()
+                    touched, self._search_touched = self._search_touched, {}
+                    delta = self._search_delta(touched)
+                    mutex.release()
+                    mutex = None
+                    self._write_records(records, last_id)
+                except Exception as e:
+                    failed = e
+                else:
+                    self._append_history(changes)
+                    self._log_search_delta(delta)
+        finally:
+            if mutex is not None:
+                mutex.release()
+        if failed is not None:
+            # Requeued only once the locks above are released: a command holding the mutex may
+            # be waiting for them, so taking the mutex under them could deadlock
+            with self.mutex:
+                self._pending[:0] = changes
+                touched.update((task_id, old) for task_id, old in self._search_touched.items()
+                               if task_id not in touched)
+                self._search_touched = touched
+            raise failed
+        return True
+
+    def close(self):
+        # Stops the autosave thread and writes whatever it had not written yet
+        if self._autosave_thread is not None:
+            self._closing.set()
+            self._autosave_thread.join()
+            self._autosave_thread = None
+        self.flush()
+        with self.mutex:
+            if self._search is not None:
+                self._save_search_index()
+
+    @property
+    def _task_index(self):
+        if self._index is None:
+            self._index = TaskIndex(self._tasks.values())
+        return self._index
+
+    @property
+    def _search_index(self):
+        if self._search is None:
+            self._search = self._load_search_index()
+        return self._search
+
+    def _load_search_index(self):
+        # The persisted index is stamped with the storage version it was built from. Every write
+        # since then appended its token delta to indexlogfile, stamped with the versions before
+        # and after it, so the index is brought up to date by folding in the chain of deltas up
+        # to the loaded version. Only a broken chain (e.g. a save_tasks elsewhere) forces a rebuild
+        tasks = self._tasks
+        # A write-behind flush in flight has taken its changes out of _search_touched but not
+        # logged them yet, so wait for it; the storage lock keeps the index and log consistent
+        with self._flush_lock:
+            stamp = self._version_stamp()
+            try:
+                with file_lock(self.storagefile + '.lock'):
+                    with open(self.indexfile, 'r') as f:
+                        data = json.load(f)
+                    search = SearchIndex.from_json(data['postings'])
+                    version, log_size = data['version'], 0
+                    if version != stamp:
+                        version, log_size = self._fold_search_log(search, version, stamp)
+                if version == stamp:
+                    if log_size > INDEX_LOG_COMPACT_BYTES:
+                        self._search = search
+                        self._save_search_index()
+                    # Changes still queued by write-behind are not on disk, so not in the log either
+                    delta = self._search_delta(self._search_touched)
+                    search.apply(delta['add'], delta['remove'])
+                    return search
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                pass
+            self._search = SearchIndex(tasks.values())
+            if not self._search_touched:  # otherwise it has changes not on disk yet, and close() saves it
+                self._save_search_index()
+            return self._search
+
+    def _fold_search_log(self, search, version, stamp):
+        # Returns the version the index was brought up to, and the size of the log read
+        with open(self.indexlogfile, 'r') as f:
+            for line in f:
+                if version == stamp:
+                    break
+                entry = json.loads(line)
+                if entry['base'] == version:
+                    search.apply(entry['add'], entry['remove'])
+                    version = entry['version']
+            return version, os.fstat(f.fileno()).st_size
+
+    def _save_search_index(self):
+        # Saved under the storage lock, so no delta can be appended between saving the index
+        # and dropping the log entries it already includes
+        stamp = self._version_stamp()
+        tmp_path = self.indexfile + '.tmp'
+        try:
+            with file_lock(self.storagefile + '.lock'):
+                with open(tmp_path, 'w') as f:
+                    json.dump({'version': stamp, 'postings': self._search.to_json()}, f)
+                os.replace(tmp_path, self.indexfile)
+                self._trim_search_log(stamp)
+        except OSError:
+            pass  # only a cache; the next search rebuilds it
+
+    def _trim_search_log(self, stamp):
+        # Keeps the deltas written after the saved version (by other processes), drops the rest
+        try:
+            with open(self.indexlogfile, 'r') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        keep = []
+        for i, line in enumerate(lines):
+            try:
+                if json.loads(line)['base'] == stamp:
+                    keep = lines[i:]
+                    break
+            except (ValueError, KeyError, TypeError):
+                continue
+        tmp_path = self.indexlogfile + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.writelines(keep)
+        os.replace(tmp_path, self.indexlogfile)
+
+    def _search_delta(self, touched):
+        # Token changes of the touched tasks against what they had on disk, stamped with the
+        # storage version they apply to
+        added, removed = defaultdict(list), defaultdict(list)
+        for task_id, old in touched.items():
+            task = self._loaded.get(task_id)
+            new = _tokenize(task.description) if task is not None else set()
+            for token in new - old:
+                added[token].append(task_id)
+            for token in old - new:
+                removed[token].append(task_id)
+        return {"base": self._version_stamp(), "add": added, "remove": removed}
+
+    def _log_search_delta(self, delta):
+        # Appended once the write it describes is on disk. Nothing is logged before the first
+        # search has saved an index, and a log nobody folds in is dropped past INDEX_LOG_MAX_BYTES
+        if not os.path.exists(self.indexfile):
+            return
+        delta["version"] = self._version_stamp()
+        try:
+            with open(self.indexlogfile, 'a') as f:
+                f.write(json.dumps(delta) + '\n')
+                size = f.tell()
+            if size > INDEX_LOG_MAX_BYTES:
+                os.remove(self.indexfile)
+                os.remove(self.indexlogfile)
+        except OSError:
+            pass  # a missing delta breaks the chain, and the next search rebuilds the index
+
+    def _version_stamp(self):
+        return list(self._version) if self._version is not None else None
+
+    def _commit(self, op, task, previous_status = None):
+        self._persist([self._change(op, task, previous_status)])
+
+    @staticmethod
+    def _change(op, task, previous_status = None):
+        # The history event is captured now, since with write-behind the task may change again
+        # before it is written; a done event also carries created_at for the cycle time rollup
+        if op == 'delete':
+            return op, task, None
+        event = {"id": task.id, "from": previous_status, "to": task.status, "at": task.update_at}
+        if event["to"] == 'done':
+            event["created"] = task.created_at
+        return op, task, event
+
+    def _persist(self, changes):
+        if self._autosave_thread is not None:
+            self._pending.extend(changes)
+            return
+        # Written at once unless write-behind is on; a file another process rewrote since the
+        # load gets the changes replayed onto it rather than being overwritten
+        with file_lock(self.storagefile + '.lock'):
+            if file_version(self.storagefile) != self._version:
+                changes = self._reconcile(changes)
+            if changes:
+                delta = self._search_delta(self._search_touched)
+                self._write_tasks()
+                self._search_touched = {}
+                self._append_history(changes)
+                self._log_search_delta(delta)
+
+    def _append_history(self, changes):
+        # One line per add or update, appended only once the change is on disk
+        lines = []
+        for _, task, event in changes:
+            if event is not None:
+                event["id"] = task.id  # reconciling may have given an added task a new id
+                lines.append(json.dumps(event) + '\n')
+        if lines:
+            with open(self.historyfile, 'a') as f:
+                f.write(''.join(lines))
+
+    def _reconcile(self, changes):
+        self.load_tasks()
+        next_free = self._next_id
+        applied = []
+        # The search delta is now taken against the reloaded tasks: the first change to each id
+        # records the tokens that task has on disk
+        touched = {}
+        for op, task, event in changes:
+            current = self._loaded.get(task.id)
+            if op == 'add':
+                if current is not None or task.id < next_free:
+                    task.id = self._get_next_id()  # taken, or deleted, by another writer since the load
+                touched.setdefault(task.id, set())
+                self._loaded[task.id] = task
+            elif current is None:
+                continue  # updated or deleted a task that another writer already deleted
+            elif op == 'update':
+                if current is not task:
+                    event["from"] = current.status  # what this update really replaced on disk
+                touched.setdefault(task.id, _tokenize(current.description))
+                self._loaded[task.id] = task
+            else:
+                touched.setdefault(task.id, _tokenize(current.description))
+                del self._loaded[task.id]
+            applied.append((op, task, event))
+        self._search_touched = touched
+        self._next_id = max(self._next_id, max(self._loaded, default=0) + 1)
+        return applied
 
     def _get_next_id(self):
-        return max((task.id for task in self.tasks),  default=0) + 1
+        # Counts up from the largest id ever used, lastidfile included, so deleted ids stay retired
+        if self._loaded is None:
+            self.load_tasks()
+        next_id = self._next_id
+        self._next_id += 1
+        return next_id
 
     def _find_by_id(self, task_id):
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
+        return self._tasks.get(task_id)
+
+    def _modify(self, task, **fields):
+        if 'description' in fields:
+            self._search_touched.setdefault(task.id, _tokenize(task.description))
+        reindex = self._search is not None and 'description' in fields
+        if self._index is not None:
+            self._index.remove(task)
+        if reindex:
+            self._search.remove(task)
+        for name, value in fields.items():
+            setattr(task, name, value)
+        if self._index is not None:
+            self._index.add(task)
+        if reindex:
+            self._search.add(task)
+
+    def _delete(self, task):
+        self._search_touched.setdefault(task.id, _tokenize(task.description))
+        if self._index is not None:
+            self._index.remove(task)
+        if self._search is not None:
+            self._search.remove(task)
+        del self._tasks[task.id]
 
     def add_task(self, description):
         now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -70,17 +754,23 @@ class TaskTracker:
             created_at = now,
             update_at = now
         )
-        self.tasks.append(task)
-        self.save_tasks()
+        self._tasks[task.id] = task
+        self._search_touched.setdefault(task.id, set())
+        if self._index is not None:
+            self._index.add(task)
+        if self._search is not None:
+            self._search.add(task)
+        self._commit('add', task)
         print(f"Task added succesfully (ID: {task.id})")
 
 
     def update_task(self, id, new_description):
         task = self._find_by_id(id)
         if task:
-            task.description = new_description
-            task.update_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_tasks()
+            self._modify(task,
+                         description = new_description,
+                         updated_ts = _now())
+            self._commit('update', task, task.status)
             print(f"Task updated succesfully (ID: {id})")
         else:
             print(f"Task not found: {id}")
@@ -88,8 +778,8 @@ class TaskTracker:
     def delete_task(self, id):
         task = self._find_by_id(id)
         if task:
-            self.tasks.remove(task)
-            self.save_tasks()
+            self._delete(task)
+            self._commit('delete', task)
             print(f"Task deleted succesfully (ID: {id})")
         else:
             print(f"Task not found: {id}")
@@ -97,9 +787,11 @@ class TaskTracker:
     def mark_in_progress(self, id):
         task = self._find_by_id(id)
         if task:
-            task.status = 'in progress'
-            task.update_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_tasks()
+            previous_status = task.status
+            self._modify(task,
+                         status_code = STATUS_CODES['in progress'],
+                         updated_ts = _now())
+            self._commit('update', task, previous_status)
             print(f"Task updated succesfully (ID: {id})")
         else:
             print(f"Task not found: {id}")
@@ -107,24 +799,141 @@ class TaskTracker:
     def mark_done(self, id):
         task = self._find_by_id(id)
         if task:
-            task.status = 'done'
-            task.update_at = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.save_tasks()
+            previous_status = task.status
+            self._modify(task,
+                         status_code = STATUS_CODES['done'],
+                         updated_ts = _now())
+            self._commit('update', task, previous_status)
             print(f"Task updated succesfully (ID: {id})")
         else:
             print(f"Task not found: {id}")
 
-    def list_tasks(self, filter_status = None):
-        filtered = self.tasks
-        if filter_status:
-            filtered = [task for task in self.tasks if task.status == filter_status]
+    def select_tasks(self, ids = None, status = None, older_than_days = None):
+        if ids is not None:
+            tasks = self._tasks
+            wanted = {}
+            for part in ids:
+                if not isinstance(part, range):
+                    wanted[part] = None
+                elif len(part) <= len(tasks):
+                    wanted.update(dict.fromkeys(part))
+                else:
+                    # A range wider than the backlog costs one pass over the existing ids, not one per id in it
+                    wanted.update(dict.fromkeys(sorted(task_id for task_id in tasks if task_id in part)))
+            selected = [task for task in map(tasks.get, wanted) if task is not None]
+            if status is not None:
+                selected = [task for task in selected if task.status == status]
+        elif status is not None:
+            tasks = self._tasks
+            selected = [tasks[task_id] for task_id in self._task_index.page(status)]
+        else:
+            selected = list(self._tasks.values())
 
-        if not filtered:
-            print("Tasks no found")
-            return
+        if older_than_days is not None:
+            cutoff = _now() - older_than_days * 86400
+            selected = [task for task in selected if _time_key(task.updated_ts) < cutoff]
+        return selected
+
+    def bulk_update(self, action, tasks):
+        # One in-memory pass and a single write, however many tasks are affected
+        now = _now()
+        target_status = {'mark-done': 'done', 'mark-in-progress': 'in progress'}.get(action)
+        target_code = STATUS_CODES.get(target_status)
+        changes = []
+        for task in tasks:
+            if action == 'delete':
+                self._delete(task)
+                changes.append(self._change('delete', task))
+            elif task.status_code != target_code:
+                previous_status = task.status
+                self._modify(task, status_code = target_code, updated_ts = now)
+                changes.append(self._change('update', task, previous_status))
+        if changes:
+            self._persist(changes)
+        verb = 'deleted' if action == 'delete' else 'updated'
+        print(f"{len(changes)} task{'s' if len(changes) != 1 else ''} {verb} succesfully")
 
+    def stats(self):
+        # Loads the saved rollups and folds in only the history appended since they were saved
+        if self._pending:
+            self.flush()  # queued changes are not in the history until written
+        try:
+            with open(self.statsfile, 'r') as f:
+                stats = TaskStats.from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            stats = TaskStats()
+        try:
+            with open(self.historyfile, 'rb') as f:
+                if stats.offset > os.fstat(f.fileno()).st_size:
+                    stats = TaskStats()  # the log was truncated or replaced
+                f.seek(stats.offset)
+                data = f.read()
+        except FileNotFoundError:
+            data = b''
+        complete = data.rfind(b'\n') + 1  # a line still being written is left for next time
+        if complete:
+            for line in data[:complete].splitlines():
+                try:
+                    stats.add(json.loads(line))
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+            stats.offset += complete
+            tmp_path = self.statsfile + '.tmp'
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(stats.to_json(), f)
+                os.replace(tmp_path, self.statsfile)
+            except OSError:
+                pass
+        return stats
+
+    def print_stats(self, days = 14):
+        stats = self.stats()
+        print(f"History events: {stats.events}")
+        print(f"Completed: {sum(stats.done_per_day.values())}")
+        if stats.cycle_count:
+            median = stats.median_cycle_hours()
+            print(f"Cycle time (created -> done) over {stats.cycle_count} tasks: "
+                  f"average {_format_duration(stats.cycle_seconds / stats.cycle_count)}, "
+                  f"median {median}h (to the hour)")
+        today = datetime.date.today()
+        print(f"Completed per day, last {days} days:")
+        for offset in range(days - 1, -1, -1):
+            day = (today - datetime.timedelta(days=offset)).isoformat()
+            print(f"  {day}  {stats.done_per_day.get(day, 0)}")
+
+    def list_tasks(self, filter_status = None, sort = 'id', offset = 0, limit = None, reverse = False):
+        if self._loaded is None and sort == 'id' and not reverse:
+            # Streams in file order, which is id order, and stops after the page
+            filtered = self._records()
+            if filter_status:
+                filtered = (task for task in filtered if task.status == filter_status)
+            filtered = islice(filtered, offset, offset + limit if limit is not None else None)
+        else:
+            tasks = self._tasks
+            filtered = (tasks[task_id] for task_id in
+                        self._task_index.page(filter_status or None, sort, offset, limit, reverse))
+
+        found = False
         for task in filtered:
-            print(f"[{task.id}]{task.description} | {task.status} | Created: {task.created_at} | Updated: {task.update_at}")
+            found = True
+            print(_format_task(task))
+
+        if not found:
+            print("Tasks no found")
+
+    def search_tasks(self, query, filter_status = None, limit = None):
+        tasks = self._tasks
+        matches = (tasks[task_id] for task_id in self._search_index.search(query))
+        if filter_status:
+            matches = (task for task in matches if task.status == filter_status)
+        found = False
+        for task in islice(matches, limit):
+            found = True
+            print(_format_task(task))
+
+        if not found:
+            print("Tasks no found")
 
 
 class CLIHandler:
@@ -156,45 +965,89 @@ class CLIHandler:
             except ValueError:
                 print("Invalid ID format.")
 
-        elif command == "delete":
-            if len(args) != 2:
-                print("Usage: task-cli delete <id>")
+        elif command in ("delete", "mark-in-progress", "mark-done"):
+            if len(args) == 2 and args[1].isdigit():
+                task_id = int(args[1])
+                {"delete": self.task_tracker.delete_task,
+                 "mark-in-progress": self.task_tracker.mark_in_progress,
+                 "mark-done": self.task_tracker.mark_done}[command](task_id)
                 return
             try:
-                task_id = int(args[1])
-                self.task_tracker.delete_task(task_id)
-            except ValueError:
-                print("Invalid ID format.")
-
-        elif command == "mark-in-progress":
-            if len(args) != 2:
-                print("Usage: task-cli mark-in-progress <id>")
+                selection = self._parse_selection(args[1:])
+            except (ValueError, IndexError):
+                print(f"Usage: task-cli {command} <id>|<id,id,...>|<from-to> [--status <status>] [--older-than <days>]")
+                print(f"Example: task-cli {command} --status in-progress --older-than 30")
                 return
+            tasks = self.task_tracker.select_tasks(**selection)
+            self.task_tracker.bulk_update(command, tasks)
+
+        elif command == "list":
+            options = {'filter_status': None, 'sort': 'id', 'offset': 0, 'limit': None, 'reverse': False}
+            rest = args[1:]
             try:
-                task_id = int(args[1])
-                self.task_tracker.mark_in_progress(task_id)
-            except ValueError:
-                print("Invalid ID format.")
+                while rest:
+                    arg = rest.pop(0)
+                    if arg == "--desc":
+                        options['reverse'] = True
+                    elif arg in ("--limit", "--offset"):
+                        options[arg[2:]] = int(rest.pop(0))
+                        if options[arg[2:]] < 0:
+                            raise ValueError(arg)
+                    elif arg == "--sort":
+                        options['sort'] = rest.pop(0)
+                        if options['sort'] not in SORT_KEYS:
+                            raise ValueError(arg)
+                    elif options['filter_status'] is None and not arg.startswith("--"):
+                        if arg not in ["todo", "done", "in-progress"]:
+                            print("Invalid status. Use: todo, done, in-progress.")
+                            return
+                        # mark-in-progress stores the status as 'in progress'
+                        options['filter_status'] = arg.replace("-", " ")
+                    else:
+                        raise ValueError(arg)
+            except (ValueError, IndexError):
+                print("Usage: task-cli list [todo|done|in-progress] [--limit N] [--offset N] [--sort id|created|updated] [--desc]")
+                return
+            self.task_tracker.list_tasks(**options)
 
-        elif command == "mark-done":
-            if len(args) != 2:
-                print("Usage: task-cli mark-done <id>")
+        elif command == "search":
+            terms = []
+            options = {'filter_status': None, 'limit': None}
+            rest = args[1:]
+            try:
+                while rest:
+                    arg = rest.pop(0)
+                    if arg == "--status":
+                        status = rest.pop(0)
+                        if status not in ["todo", "done", "in-progress"]:
+                            raise ValueError(status)
+                        options['filter_status'] = status.replace("-", " ")
+                    elif arg == "--limit":
+                        options['limit'] = int(rest.pop(0))
+                        if options['limit'] < 0:
+                            raise ValueError(arg)
+                    else:
+                        terms.append(arg)
+                if not terms:
+                    raise ValueError("no terms")
+            except (ValueError, IndexError):
+                print("Usage: task-cli search <words...> [--status todo|done|in-progress] [--limit N]")
                 return
+            self.task_tracker.search_tasks(" ".join(terms), **options)
+
+        elif command == "stats":
             try:
-                task_id = int(args[1])
-                self.task_tracker.mark_done(task_id)
-            except ValueError:
-                print("Invalid ID format.")
+                days = int(args[args.index("--days") + 1]) if "--days" in args else 14
+            except (ValueError, IndexError):
+                print("Usage: task-cli stats [--days N]")
+                return
+            self.task_tracker.print_stats(days)
 
-        elif command == "list":
-            if len(args) == 2:
-                status = args[1]
-                if status not in ["todo", "done", "in-progress"]:
-                    print("Invalid status. Use: todo, done, in-progress.")
-                    return
-                self.task_tracker.list_tasks(status)
+        elif command == "sync":
+            if self.task_tracker.flush():
+                print("All changes saved")
             else:
-                self.task_tracker.list_tasks()
+                print("Nothing to save")
 
         elif command == "help":
             self.print_help()
@@ -203,6 +1056,36 @@ class CLIHandler:
             print(f"Unknown command: {command}")
             self.print_help()
 
+    @staticmethod
+    def _parse_selection(args):
+        # Ids ("3", "1,2,5", "10-20"), optionally narrowed by --status and --older-than (days since last update)
+        ids = None
+        status = None
+        older_than_days = None
+        args = list(args)
+        while args:
+            arg = args.pop(0)
+            if arg == "--status":
+                status = args.pop(0)
+                if status not in ["todo", "done", "in-progress"]:
+                    raise ValueError(status)
+                status = status.replace("-", " ")
+            elif arg == "--older-than":
+                older_than_days = int(args.pop(0))
+            else:
+                ids = ids if ids is not None else []
+                for part in arg.split(","):
+                    if not part:
+                        continue
+                    first, _, last = part.partition("-")
+                    if last:
+                        ids.append(range(int(first), int(last) + 1))
+                    else:
+                        ids.append(int(first))
+        if ids is None and status is None and older_than_days is None:
+            raise ValueError("empty selection")
+        return {"ids": ids, "status": status, "older_than_days": older_than_days}
+
     def print_help(self):
         print("""
 Available commands:
@@ -211,32 +1094,63 @@ Available commands:
   delete <id>                       Delete a task
   mark-in-progress <id>             Mark a task as in progress
   mark-done <id>                    Mark a task as done
+  delete|mark-in-progress|mark-done <ids> [--status <status>] [--older-than <days>]
+                                    Apply to many tasks with one save, e.g.
+                                    mark-done 1,4,7-12   or   mark-done --status in-progress --older-than 30
   list                              List all tasks
   list todo                         List tasks with status 'todo'
   list done                         List tasks with status 'done'
   list in-progress                  List tasks with status 'in-progress'
+  list [status] [--limit N] [--offset N] [--sort id|created|updated] [--desc]
+                                    Page through tasks in the given order
+  search <words...> [--status <status>] [--limit N]
+                                    Tasks whose description has every word (or a word
+                                    starting with it), e.g. search groc buy --status todo
+  stats [--days N]                  Completed tasks per day and cycle time, from the
+                                    history of status changes
+  sync                              Write pending changes to disk now (the interactive mode
+                                    otherwise saves in the background every few hundred ms)
+  serve                             Keep tasks in memory and answer commands from other
+                                    invocations over a Unix socket (started from the command line)
 """)
 
 
 def main():
-    task_tracker = TaskTracker()
+    socket_path = os.path.abspath(os.environ.get(SOCKET_ENV_VAR, DEFAULT_SOCKET))
+    if len(sys.argv) > 1 and sys.argv[1] != 'serve' and send_to_daemon(sys.argv[1:], socket_path):
+        return
+
+    # One-shot invocations load lazily, so 'help' or a streamed 'list' never pays for a full parse.
+    # The interactive mode saves write-behind, unless TASK_TRACKER_AUTOSAVE_MS is 0
+    interactive = len(sys.argv) == 1
+    task_tracker = TaskTracker(lazy=not interactive and sys.argv[1] != 'serve',
+                               autosave_ms=int(os.environ.get(AUTOSAVE_ENV_VAR, DEFAULT_AUTOSAVE_MS)) if interactive else None)
     cli = CLIHandler(task_tracker)
 
-    if len(sys.argv) == 1:
+    if sys.argv[1:] == ['serve']:
+        serve(cli, task_tracker.refresh, socket_path)
+        task_tracker.close()
+        return
+
+    if interactive:
         print("🔁 Task Tracker CLI — interactive mode. Type 'help' for commands.")
-        while True:
-            try:
-                user_input = input("task-cli> ").strip()
-                if user_input.lower() in ("exit", "quit"):
-                    print("Exiting...")
+        try:
+            while True:
+                try:
+                    user_input = input("task-cli> ").strip()
+                    if user_input.lower() in ("exit", "quit"):
+                        print("Exiting...")
+                        break
+                    if user_input == "":
+                        continue
+                    args = user_input.split()
+                    with task_tracker.mutex:
+                        cli.handle_command(args)
+                except (KeyboardInterrupt, EOFError):
+                    print("\nInterrupted. Exiting...")
                     break
-                if user_input == "":
-                    continue
-                args = user_input.split()
-                cli.handle_command(args)
-            except KeyboardInterrupt:
-                print("\nInterrupted. Exiting...")
-                break
+        finally:
+            task_tracker.close()
     else:
         cli.handle_command(sys.argv[1:])
 
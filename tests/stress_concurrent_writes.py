@@ -0,0 +1,105 @@
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_tracker
+import simple_task_tracker
+
+# Hammers one storage file from many processes at once and checks that no add, update or
+# delete was lost: every worker adds its own records, renames every 5th and deletes every 7th,
+# each through its own long-lived tracker, so most writes have to reconcile with the others'
+
+TARGETS = ['tasks', 'expenses:json', 'expenses:journal', 'expenses:sqlite']
+
+
+def open_tracker(target, path):
+    if target == 'tasks':
+        return simple_task_tracker.TaskTracker(path)
+    backend = target.split(':')[1]
+    return expense_tracker.ExpenseTracker(path, storage=expense_tracker.open_storage(backend, path))
+
+
+def expected_records(worker, records):
+    # description by record number, for the records this worker leaves behind
+    expected = {}
+    for i in range(records):
+        if i % 7 == 3:
+            continue
+        expected[i] = f"w{worker}-{i}" + (" renamed" if i % 5 == 0 else "")
+    return expected
+
+
+def hammer(target, path, worker, records):
+    tracker = open_tracker(target, path)
+    tasks = target == 'tasks'
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(records):
+            description = f"w{worker}-{i}"
+            if tasks:
+                tracker.add_task(description)
+                # Reconciling may have moved the task to another id, so find it by description
+                record_id = next(task.id for task in tracker.tasks if task.description == description)
+            else:
+                record_id = tracker._add(description, i).id
+            if i % 5 == 0:
+                if tasks:
+                    tracker.update_task(record_id, description + " renamed")
+                else:
+                    tracker.update_expense(record_id, description + " renamed", i, None)
+            if i % 7 == 3:
+                if tasks:
+                    tracker.delete_task(record_id)
+                else:
+                    tracker.delete_expense(record_id)
+    if not tasks:
+        tracker.close()
+
+
+def check(target, processes, records):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'storage.json')
+        workers = [multiprocessing.Process(target=hammer, args=(target, path, worker, records))
+                   for worker in range(processes)]
+        for process in workers:
+            process.start()
+        for process in workers:
+            process.join()
+            assert process.exitcode == 0, f"{target}: a worker failed with exit code {process.exitcode}"
+
+        tracker = open_tracker(target, path)
+        found = tracker.tasks if target == 'tasks' else tracker.expenses
+        ids = [record.id for record in found]
+        descriptions = sorted(record.description for record in found)
+        expected = sorted(description for worker in range(processes)
+                          for description in expected_records(worker, records).values())
+        if target != 'tasks':
+            tracker.close()
+
+    assert len(ids) == len(set(ids)), f"{target}: duplicate ids"
+    assert len(found) == len(expected), f"{target}: {len(found)} records, expected {len(expected)}"
+    assert descriptions == expected, f"{target}: records lost or stale: {sorted(set(expected) - set(descriptions))[:5]}"
+    print(f"{target}: {processes} processes x {records} records, {len(found)} kept, none lost")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress concurrent writes to the tracker storage files")
+    parser.add_argument('targets', nargs='*', help=f"any of {', '.join(TARGETS)} (default: all)")
+    parser.add_argument('--processes', type=int, default=6)
+    parser.add_argument('--records', type=int, default=80, help="records added per process")
+    args = parser.parse_args()
+    unknown = set(args.targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown target: {', '.join(sorted(unknown))}")
+
+    for target in args.targets or TARGETS:
+        check(target, args.processes, args.records)
+
+
+if __name__ == '__main__':
+    main()
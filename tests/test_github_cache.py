@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Checks the GitHub response cache against a local stand-in for the API: a stale entry is
+# revalidated with If-None-Match and served from disk on a 304, a fresh one is served without
+# any request, and the least recently used entries are the ones evicted
+
+REQUESTS = []
+
+
+class FakeGitHub(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        REQUESTS.append((self.path, self.headers.get("If-None-Match")))
+        username = self.path.split("?")[0].strip("/").split("/")[1]
+        etag = f'"{username}-1"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps([{"id": "1", "type": "WatchEvent", "repo": {"name": f"{username}/repo"}}]).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+SERVER = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHub)
+threading.Thread(target=SERVER.serve_forever, daemon=True).start()
+os.environ["GITHUB_API_URL"] = f"http://127.0.0.1:{SERVER.server_port}"
+os.environ.pop("GITHUB_TOKEN", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github_user_activity
+
+
+def fetch(username, cache):
+    events = github_user_activity.fetch_user_events(username, cache)
+    assert events and events[0]["repo"]["name"] == f"{username}/repo", events
+    return events
+
+
+def test_stale_entry_is_revalidated():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = github_user_activity.ResponseCache(tmp, ttl=0)
+        del REQUESTS[:]
+        first = fetch("octocat", cache)
+        second = fetch("octocat", cache)
+        assert second == first
+        assert [etag for _, etag in REQUESTS] == [None, '"octocat-1"'], REQUESTS
+
+
+def test_fresh_entry_skips_the_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = github_user_activity.ResponseCache(tmp, ttl=60)
+        del REQUESTS[:]
+        fetch("octocat", cache)
+        fetch("octocat", cache)
+        assert len(REQUESTS) == 1, REQUESTS
+
+
+def test_least_recently_used_entries_are_evicted():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = github_user_activity.ResponseCache(tmp, ttl=60, max_entries=3)
+        for username in ("a", "b", "c"):
+            fetch(username, cache)
+            time.sleep(0.01)  # distinct mtimes, which record the last use
+        fetch("a", cache)  # a cache hit makes "a" the most recently used
+        time.sleep(0.01)
+        # A new cache, like the next run of the CLI, runs an eviction pass on its first put
+        cache = github_user_activity.ResponseCache(tmp, ttl=60, max_entries=3)
+        fetch("d", cache)
+
+        url = f"{github_user_activity.API_URL}/users/%s/events"
+        assert cache.get(url % "b") is None
+        assert all(cache.get(url % username) is not None for username in ("a", "c", "d"))
+        assert len(os.listdir(tmp)) == 3
+
+
+def main():
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"{name}: ok")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import contextlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Storage and daemon plumbing shared by expense_tracker.py and simple_task_tracker.py, so the
+# two trackers lock, version, stream and serve their files the same way
+
+
+def iter_json_array(path, chunk_size = 65536):
+    # Yields the elements of a top-level JSON array one at a time, reading the file in chunks
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer = ''
+        pos = 0
+        while True:
+            chunk = f.read(chunk_size)
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n[,':
+                    pos += 1
+                if pos >= len(buffer) or buffer[pos] == ']':
+                    break
+                try:
+                    record, pos = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # element continues in the next chunk
+                yield record
+            if not chunk or buffer[pos:pos + 1] == ']':
+                return
+
+
+@contextmanager
+def file_lock(path):
+    # Exclusive advisory lock held on a side file, so the data file itself can be replaced atomically
+    with open(path, 'a+') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat_version(stat)
+
+
+def stat_version(stat):
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def write_json_atomic(path, data, indent=None):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_last_id(path):
+    try:
+        with open(path, 'r') as f:
+            return int(json.load(f))
+    except (OSError, ValueError, TypeError):
+        return 0
+
+
+def serve(cli, refresh, socket_path):
+    # Keeps the tracker hot in memory and runs one command per connection: the client sends
+    # its args as a JSON line and gets back whatever the command printed
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen()
+    signal.signal(signal.SIGTERM, signal.default_int_handler)  # stop cleanly on kill as well
+    print(f"Serving on {socket_path} (Ctrl+C to stop)")
+    try:
+        while True:
+            connection, _ = server.accept()
+            with connection, connection.makefile('rwb') as stream:
+                try:
+                    args = json.loads(stream.readline())
+                except ValueError:
+                    continue
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    try:
+                        refresh()
+                        cli.handle_command(args)
+                    except Exception as e:
+                        print(f"Error: {e}")
+                try:
+                    stream.write(output.getvalue().encode())
+                except OSError:
+                    pass  # client went away
+    except KeyboardInterrupt:
+        print("\nStopping server")
+    finally:
+        server.close()
+        os.remove(socket_path)
+
+
+def send_to_daemon(args, socket_path):
+    # Returns False when no daemon is listening, so the caller can run the command itself
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return False
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(socket_path)
+    except OSError:
+        client.close()
+        return False
+    with client, client.makefile('rwb') as stream:
+        stream.write(json.dumps(args).encode() + b'\n')
+        stream.flush()
+        client.shutdown(socket.SHUT_WR)
+        sys.stdout.write(stream.read().decode())
+    return True